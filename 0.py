@@ -1,7 +1,13 @@
 #!/usr/bin/env python3
 # Super Mario 3D World - Open World Playground (Solid Ground)
 from ursina import *
+from chase_camera import StaticBroadphase, ChaseCamera
+from ccd import SweptCapsule
+from jobs import JobScheduler, HIGH, NORMAL, LOW
+from sim_thread import CoinSim, SimWorker, FREE_THREADED
 import random, math, os
+from timers import Scheduler
+from components import CoinState, BlockState, memory_report
 
 app = Ursina()
 window.title = "Super Mario 3D World - Open World Playground"
@@ -9,6 +15,16 @@ window.size = (1280, 720)
 window.borderless = False
 window.fps_counter.enabled = True
 
+# Timers and animation coroutines; ticked once per frame from update()
+scheduler = Scheduler()
+
+# Expensive work (world building, spawns, resets) is time-sliced across frames
+jobs = JobScheduler(budget=0.004)
+
+# Coin spin/bob and pickup run on a worker thread against plain arrays
+coin_sim = CoinSim()
+sim_worker = SimWorker(coin_sim)
+
 # --------------------------
 # Textures and Materials
 # --------------------------
@@ -42,7 +58,7 @@ class Mario(Entity):
         self.coins_collected = 0
         
         # Simple animation states
-        self.jump_animation = 0
+        self.jump_animation = None
         self.base_scale_y = 1.6
         
     def update(self):
@@ -62,23 +78,21 @@ class Mario(Entity):
             if held_keys['space']:
                 self.y_vel = self.jump_power
                 self.grounded = False
-                self.jump_animation = 1
+                self.jump_animation = scheduler.start(self.squash())
         
-        # Upward raycast for hitting question blocks from below
-        if self.y_vel > 0:
-            hit_up = raycast(
-                self.position + (0, 0.8, 0), 
-                direction=(0, 1, 0),
-                distance=0.5, 
-                ignore=[self]
-            )
-            if hit_up.hit and isinstance(hit_up.entity, QuestionBlock) and hit_up.entity.active:
-                hit_up.entity.hit()
-                self.y_vel *= -0.5  # Gentle bounce-back
-        
-        # Gravity
+        # Gravity, then this frame's rise or fall as a swept capsule: the move
+        # stops at the first thing it would pass through, however long the frame
         self.y_vel -= self.gravity * time.dt
-        self.y += self.y_vel * time.dt
+        dy = self.y_vel * time.dt
+        if dy > 0:
+            # Platforms are jump-through; only question blocks stop a jump
+            dy, block = capsule.move_y(self.position, dy, accept=is_active_block)
+            if block is not None:
+                block.hit()
+                self.y_vel *= -0.5  # Gentle bounce-back
+        else:
+            dy, _ = capsule.move_y(self.position, dy)
+        self.y += dy
         
         # Ground check with better collision
         hit = raycast(
@@ -92,35 +106,41 @@ class Mario(Entity):
             self.grounded = True
             self.y = hit.world_point.y + 0.8
             self.y_vel = max(0, self.y_vel)  # Prevent sticking to ceiling
-            self.jump_animation = 0
+            if self.jump_animation:
+                self.jump_animation.cancel()
+                self.jump_animation = None
         else:
             self.grounded = False
-            
+
+    def squash(self):
         # Simple scale animation for jumping
-        if self.jump_animation > 0:
-            self.scale_y = self.base_scale_y + math.sin(self.jump_animation * 10) * 0.2
-            self.jump_animation -= time.dt
+        start = scheduler.time
+        while scheduler.time - start < 1:
+            remaining = 1 - (scheduler.time - start)
+            self.scale_y = self.base_scale_y + math.sin(remaining * 10) * 0.2
+            yield
 
 # --------------------------
 # Collectible Coins
 # --------------------------
 class Coin(Entity):
-    def __init__(self, position, **kwargs):
+    # Spin, bob and pickup are simulated by coin_sim on the worker thread, so
+    # coins need neither an update() nor a collider
+    def __init__(self, position, collectible=True, **kwargs):
         super().__init__(
             model='sphere',
             color=color.yellow,
             scale=0.5,
             position=position,
-            collider='sphere',
+            add_to_scene_entities=False,
             **kwargs
         )
-        self.original_y = self.y
-        self.rotation_speed = 100
-        
-    def update(self):
-        self.rotation_y += time.dt * self.rotation_speed
-        # Bobbing animation (no drift)
-        self.y = self.original_y + math.sin(time.time() * 5) * 0.05
+        self.state = CoinState(coin_sim.add(self.position, time.time(), collectible))
+        sim_worker.bind(self.state.index, self)
+
+    def on_destroy(self):
+        sim_worker.unbind(self.state.index)
+        coin_sim.remove(self.state.index)
 
 # --------------------------
 # Question Blocks
@@ -133,33 +153,46 @@ class QuestionBlock(Entity):
             scale=(1, 1, 1),
             position=position,
             collider='box',
+            add_to_scene_entities=False,  # no per-frame update; raycasts still hit it
             **kwargs
         )
-        self.active = True
-        self.bounce_animation = 0
-        self.original_y = self.y
+        self.state = BlockState(self.y)
         
     def hit(self):
-        if self.active:
-            self.active = False
-            self.bounce_animation = 1
+        state = self.state
+        if state.active:
+            state.active = False
+            state.bounce_animation = scheduler.start(self.bounce())
             self.color = color.gray  # Change color when hit
             # Spawn a coin
-            coin = Coin(position=self.position + (0, 2, 0))
-            invoke(destroy, coin, delay=2)  # Remove coin after 2 seconds
-            
-    def update(self):
-        if self.bounce_animation > 0:
-            self.y = self.original_y + math.sin(self.bounce_animation * 10) * 0.1
-            self.bounce_animation -= time.dt
-            if self.bounce_animation < 0:
-                self.bounce_animation = 0
-                self.y = self.original_y
+            position = self.position + (0, 2, 0)
+            jobs.submit(lambda: spawn_bonus_coin(position), HIGH, 'spawn')
+
+    # No update(): idle blocks cost nothing per frame, the bounce runs as a coroutine
+    def bounce(self):
+        state = self.state
+        start = scheduler.time
+        while scheduler.time - start < 1:
+            remaining = 1 - (scheduler.time - start)
+            self.y = state.original_y + math.sin(remaining * 10) * 0.1
+            yield
+        self.y = state.original_y
+        state.bounce_animation = None
+
+def is_active_block(entity):
+    return isinstance(entity, QuestionBlock) and entity.state.active
+
+def spawn_bonus_coin(position):
+    coin = Coin(position=position, collectible=False)
+    scheduler.after(2, destroy, coin)  # Remove coin after 2 seconds
 
 # --------------------------
 # Enhanced Terrain
 # --------------------------
-def create_enhanced_terrain(size=40):
+# World builders are generators: each yield is a point where the job
+# scheduler may stop and carry on next frame. Terrain goes into the
+# broadphase as it's made, so Mario's falls are swept from the first frame.
+def create_enhanced_terrain(size, solids):
     # Main ground
     ground = Entity(
         model='plane',
@@ -168,6 +201,9 @@ def create_enhanced_terrain(size=40):
         position=(0, 0, 0),
         collider='mesh'
     )
+    solids.append(ground)
+    broadphase.add(ground)
+    yield
     
     # Add some platforms at different heights
     platform_heights = [3, 5, 8]
@@ -180,6 +216,9 @@ def create_enhanced_terrain(size=40):
                 position=(random.randint(-15, 15), height, random.randint(-15, 15)),
                 collider='box'
             )
+            solids.append(platform)
+            broadphase.add(platform)
+            yield
     
     # Add some hills
     for i in range(10):
@@ -191,11 +230,14 @@ def create_enhanced_terrain(size=40):
             collider='sphere'
         )
         hill.y = hill.scale_y / 2  # Position on ground
+        solids.append(hill)
+        broadphase.add(hill)
+        yield
 
 # --------------------------
 # Environment Decorations
 # --------------------------
-def create_environment():
+def create_environment(trunks, decorations):
     # Trees with better appearance
     for i in range(30):
         trunk_height = random.uniform(2, 4)
@@ -213,6 +255,9 @@ def create_environment():
             scale=random.uniform(2, 4),
             position=tree_trunk.position + (0, trunk_height, 0)
         )
+        trunks.append(tree_trunk)
+        decorations.append(tree_top)
+        yield
     
     # Flowers and bushes
     for i in range(50):
@@ -223,6 +268,31 @@ def create_environment():
             position=(random.randint(-38, 38), 0.5, random.randint(-38, 38))
         )
         bush.y = bush.scale_y / 2
+        decorations.append(bush)
+        yield
+
+# --------------------------
+# Coins and Blocks
+# --------------------------
+def spawn_coins(positions):
+    for position in positions:
+        coins.append(Coin(position=position))
+        yield
+
+def spawn_question_blocks(positions):
+    for position in positions:
+        question_blocks.append(QuestionBlock(position=position))
+        yield
+
+def reset_level():
+    for block in question_blocks:
+        block.state.active = True
+        block.color = color.orange
+    yield
+    while coins:
+        destroy(coins.pop())
+        yield
+    yield from spawn_coins(coin_spawns)
 
 # --------------------------
 # UI Elements
@@ -237,7 +307,7 @@ class GameUI:
         )
         
         self.instructions = Text(
-            text='WASD: Move/Turn | SPACE: Jump | SHIFT: Run',
+            text='WASD: Move/Turn | SPACE: Jump | SHIFT: Run | M: Memory | J: Jobs',
             position=(-0.8, 0.4),
             scale=1.5,
             color=color.white
@@ -249,55 +319,65 @@ class GameUI:
 # Skybox
 sky = Sky(color=color.rgb(135, 206, 235))
 
-# Create world
-create_enhanced_terrain(80)
-create_environment()
+# Static level for the chase camera and Mario's swept collision
+broadphase = StaticBroadphase()
+capsule = SweptCapsule(broadphase)
+
+# Create world (built over the first frames; the ground comes first)
+terrain_solids, tree_trunks, decorations = [], [], []
+jobs.submit(create_enhanced_terrain(80, terrain_solids), HIGH, 'world')
+jobs.submit(create_environment(tree_trunks, decorations), NORMAL, 'world')
 
 # Create Mario
 mario = Mario(position=(0, 5, 0))
 
 # Create coins
 coins = []
-for i in range(20):
-    coin = Coin(position=(
-        random.randint(-35, 35),
-        2,
-        random.randint(-35, 35)
-    ))
-    coins.append(coin)
+coin_spawns = [(random.randint(-35, 35), 2, random.randint(-35, 35)) for i in range(20)]
+jobs.submit(spawn_coins(coin_spawns), NORMAL, 'world')
 
 # Create question blocks
 question_blocks = []
-for i in range(10):
-    block = QuestionBlock(position=(
-        random.randint(-30, 30),
-        3,
-        random.randint(-30, 30)
-    ))
-    question_blocks.append(block)
+block_spawns = [(random.randint(-30, 30), 3, random.randint(-30, 30)) for i in range(10)]
+jobs.submit(spawn_question_blocks(block_spawns), NORMAL, 'world')
 
 # Setup UI
 game_ui = GameUI()
 
+# Chase camera: one swept query per frame against the static level, the
+# rest of which is registered once the world jobs above have finished
+chase_cam = ChaseCamera(mario, broadphase, offset=Vec3(0, 8, -12), look_ahead=3, speed=6)
+
+def register_static():
+    broadphase.add_all(tree_trunks + question_blocks)
+    broadphase.add_all(decorations, solid=False)  # faded when in the way
+
+jobs.submit(register_static, NORMAL, 'world')
+
 # --------------------------
 # Collision Detection
 # --------------------------
 def update():
-    # Update coin collection
-    for coin in coins[:]:
-        if coin.intersects(mario).hit:
-            coins.remove(coin)
-            destroy(coin)
-            mario.coins_collected += 1
-            game_ui.coin_text.text = f'Coins: {mario.coins_collected}'
-    
-    # Smooth chase cam with better angles
-    target_position = mario.position + Vec3(0, 8, -12)
-    camera.position = lerp(camera.position, target_position, time.dt * 6)
+    # Expiring timers and running coroutines, then this frame's slice of queued jobs
+    scheduler.tick(time.dt)
+    jobs.run()
+
+    # Coin collection: pick up the worker's last step (if it's done), write its
+    # transforms to the coins in one pass, then hand it the next frame
+    hits = sim_worker.collect()
+    if hits is not None:
+        for index in hits:
+            coin = sim_worker.nodes[index]
+            if coin in coins:
+                coins.remove(coin)
+                destroy(coin)
+                mario.coins_collected += 1
+                game_ui.coin_text.text = f'Coins: {mario.coins_collected}'
+        sim_worker.apply()
+        sim_worker.submit(time.time(), mario.position)
     
-    # Make camera look slightly ahead of Mario
-    look_target = mario.position + mario.forward * 3 + Vec3(0, 2, 0)
-    camera.look_at(look_target)
+    # Smooth chase cam that pulls in behind occluders, looking slightly ahead of Mario
+    chase_cam.update()
     
     # Water death plane
     if mario.y < -10:
@@ -311,10 +391,21 @@ def input(key):
     if key == 'escape':
         application.quit()
     elif key == 'r':
-        # Reset game
+        # Reset game: Mario right away, the level over the next frames
         mario.position = (0, 10, 0)
         mario.coins_collected = 0
         game_ui.coin_text.text = 'Coins: 0'
+        if not jobs.busy('reset'):
+            jobs.submit(reset_level(), LOW, 'reset')
+    elif key == 'm':
+        # Memory accounting (bytes per entity type, nodes, colliders, textures)
+        # Coins and blocks stay out of scene.entities; every live coin, bonus
+        # ones included, is bound to a sim slot
+        live_coins = [coin for coin in sim_worker.nodes if coin is not None]
+        print(memory_report(scene.entities + question_blocks + live_coins, scene))
+    elif key == 'j':
+        # Job queue latency stats
+        print(jobs.report())
 
 # --------------------------
 # Start the Game
@@ -323,5 +414,6 @@ if __name__ == '__main__':
     print("Super Mario 3D World - Open World Playground")
     print("Controls: W/S forward/back, A/D turn, SPACE to jump, SHIFT to run")
     print("Find and collect all the coins!")
+    print("Coin simulation thread:", "free-threaded" if FREE_THREADED else "GIL (NumPy steps release it)")
     
     app.run()
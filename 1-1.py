@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 # Super Mario 3D World - Open World Playground (Solid Ground)
 from ursina import *
+from chase_camera import StaticBroadphase, ChaseCamera
+from jobs import JobScheduler, HIGH
 import random, math
 
 app = Ursina()
@@ -8,6 +10,9 @@ window.title = "Super Mario 3D World - Open World Playground"
 window.size = (1280, 720)
 window.color = color.rgb(135, 206, 235)   # sky blue
 
+# The 10,000-block ground is built a slice per frame instead of before app.run()
+jobs = JobScheduler(budget=0.004)
+
 # --------------------------
 # Mario Player
 # --------------------------
@@ -48,25 +53,29 @@ class Mario(Entity):
 # Terrain
 # --------------------------
 def create_grass_world(size=40):
-    for x in range(-size//2, size//2):
-        for z in range(-size//2, size//2):
-            Entity(model='cube',
-                   color=color.lime,
-                   texture='white_cube',
-                   texture_scale=(2,2),
-                   position=(x,0,z),
-                   scale=(1,1,1),
-                   collider='box')
-
-create_grass_world(100)  # 100x100 block world
+    # Center out, so the ground under Mario's spawn exists on the first frame
+    cells = [(x, z) for x in range(-size//2, size//2) for z in range(-size//2, size//2)]
+    cells.sort(key=lambda c: c[0]*c[0] + c[1]*c[1])
+    for x, z in cells:
+        Entity(model='cube',
+               color=color.lime,
+               texture='white_cube',
+               texture_scale=(2,2),
+               position=(x,0,z),
+               scale=(1,1,1),
+               collider='box')
+        yield
+
+jobs.submit(create_grass_world(100), HIGH, 'world')  # 100x100 block world
 
 # Decorative "trees"
+trees = []
 for i in range(60):
-    Entity(model='cube',
+    trees.append(Entity(model='cube',
            color=color.rgb(0, random.randint(150,200), 0),
            scale=(random.uniform(1,3), random.uniform(2,6), random.uniform(1,3)),
            position=(random.randint(-40,40),1,random.randint(-40,40)),
-           collider='box')
+           collider='box'))
 
 # --------------------------
 # Entities
@@ -79,11 +88,15 @@ mario = Mario(position=(0,2,0))
 camera.fov = 75
 camera.rotation_x = 20
 
+# Only the trees can get between Mario and the camera; the flat grid can't
+broadphase = StaticBroadphase()
+broadphase.add_all(trees)
+chase_cam = ChaseCamera(mario, broadphase, offset=Vec3(0,12,-20), look_ahead=0, speed=5)
+
 def update():
+    jobs.run()
+
     # Smooth chase cam
-    camera.position = lerp(camera.position,
-                           mario.position + Vec3(0,12,-20),
-                           time.dt*5)
-    camera.look_at(mario.position + Vec3(0,2,0))
+    chase_cam.update()
 
 app.run()
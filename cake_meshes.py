@@ -0,0 +1,193 @@
+# Parametric meshes for B3313-style cake rooms (disks, rings, pillars, tiered cakes)
+#
+# Geometry is built as NumPy arrays and handed to ursina's Mesh as flat
+# float32/uint32 buffers, which it copies straight into the vertex buffers --
+# no per-vertex Vec3. Results are memoized by a hash of the parameters, in
+# memory and as .npz files on disk, so a room with thousands of props
+# rebuilds from cache in milliseconds.
+import hashlib, json, os
+import numpy as np
+from ursina import Mesh
+
+VERSION = 1     # bump when a generator changes so stale cache files are ignored
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.mesh_cache')
+
+_memory = {}
+
+
+# --------------------------
+# Helpers
+# --------------------------
+def _orient(v, n, t):
+    # ursina is y-up-left: a triangle faces out when cross(b-a, c-a) points
+    # against its normal. Flip any that don't, so generators needn't care.
+    a, b, c = v[t[:, 0]], v[t[:, 1]], v[t[:, 2]]
+    face_normal = n[t[:, 0]] + n[t[:, 1]] + n[t[:, 2]]
+    flip = (np.cross(b - a, c - a) * face_normal).sum(axis=1) > 0
+    t[flip] = t[flip][:, ::-1]
+    return t
+
+
+def merge(parts):
+    vertices, normals, triangles = [], [], []
+    offset = 0
+    for v, n, t in parts:
+        vertices.append(v)
+        normals.append(n)
+        triangles.append(t + offset)
+        offset += len(v)
+    return np.concatenate(vertices), np.concatenate(normals), np.concatenate(triangles)
+
+
+def scatter(part, positions, scales=None):
+    # Copy one part to many positions in a single vectorized pass
+    v, n, t = part
+    positions = np.asarray(positions, dtype=np.float32).reshape(-1, 1, 3)
+    count = len(positions)
+    placed = v[None] * (1 if scales is None else np.asarray(scales, dtype=np.float32).reshape(count, 1, -1))
+    placed = (placed + positions).reshape(-1, 3)
+    offsets = (np.arange(count, dtype=np.uint32) * len(v)).reshape(-1, 1, 1)
+    return placed, np.tile(n, (count, 1)), (t[None] + offsets).reshape(-1, 3)
+
+
+# --------------------------
+# Generators: each returns (vertices (n,3) float32, normals (n,3) float32, triangles (m,3) uint32)
+# --------------------------
+def disk(radius=1, segments=48, y=0, facing=1):
+    a = np.arange(segments) * (2 * np.pi / segments)
+    v = np.zeros((segments + 1, 3), dtype=np.float32)
+    v[1:, 0] = np.cos(a) * radius
+    v[1:, 2] = np.sin(a) * radius
+    v[:, 1] = y
+    n = np.zeros_like(v)
+    n[:, 1] = facing
+    i = np.arange(segments, dtype=np.uint32)
+    t = np.stack((np.zeros_like(i), i + 1, (i + 1) % segments + 1), axis=1)
+    return v, n, _orient(v, n, t)
+
+
+def ring(inner=0.5, outer=1, segments=48, y=0):
+    a = np.arange(segments) * (2 * np.pi / segments)
+    circle = np.stack((np.cos(a), np.zeros_like(a), np.sin(a)), axis=1).astype(np.float32)
+    v = np.concatenate((circle * inner, circle * outer))
+    v[:, 1] = y
+    n = np.zeros_like(v)
+    n[:, 1] = 1
+    i = np.arange(segments, dtype=np.uint32)
+    j = (i + 1) % segments
+    s = np.uint32(segments)
+    t = np.concatenate((np.stack((i, j, i + s), axis=1), np.stack((j, j + s, i + s), axis=1)))
+    return v, n, _orient(v, n, t)
+
+
+def cylinder(radius=0.5, height=1, segments=24, y=0):
+    # Pillar / cake tier: smooth side wall plus flat caps
+    a = np.arange(segments) * (2 * np.pi / segments)
+    circle = np.stack((np.cos(a), np.zeros_like(a), np.sin(a)), axis=1).astype(np.float32)
+    bottom, top = circle * radius, circle * radius
+    bottom[:, 1], top[:, 1] = y, y + height
+    side_v = np.concatenate((bottom, top))
+    side_n = np.concatenate((circle, circle))
+    i = np.arange(segments, dtype=np.uint32)
+    j = (i + 1) % segments
+    s = np.uint32(segments)
+    side_t = np.concatenate((np.stack((i, j, i + s), axis=1), np.stack((j, j + s, i + s), axis=1)))
+    side = (side_v, side_n, _orient(side_v, side_n, side_t))
+    return merge((side, disk(radius, segments, y + height, 1), disk(radius, segments, y, -1)))
+
+
+def box(size=(1, 1, 1)):
+    # Centered box, four vertices per face so edges stay hard
+    axes = np.eye(3, dtype=np.float32)
+    half = np.asarray(size, dtype=np.float32) / 2
+    corners = np.array(((-1, -1), (1, -1), (1, 1), (-1, 1)), dtype=np.float32)
+    vertices, normals = [], []
+    for axis in range(3):
+        u, w = axes[(axis + 1) % 3], axes[(axis + 2) % 3]
+        for sign in (1, -1):
+            normal = axes[axis] * sign
+            face = normal + corners[:, :1] * u + corners[:, 1:] * w
+            vertices.append(face * half)
+            normals.append(np.tile(normal, (4, 1)))
+    v, n = np.concatenate(vertices), np.concatenate(normals)
+    quads = np.arange(6, dtype=np.uint32)[:, None] * 4
+    t = np.concatenate((quads + [0, 1, 2], quads + [2, 3, 0])).astype(np.uint32)
+    return v, n, _orient(v, n, t)
+
+
+def boxes(positions, size=(1, 1, 1)):
+    return scatter(box(size), positions)
+
+
+def pillar_ring(count=12, radius=8, size=(1, 3, 1), y=1.5):
+    a = np.radians(np.arange(count) * (360 / count))
+    positions = np.stack((np.cos(a) * radius, np.full(count, y), np.sin(a) * radius), axis=1)
+    return boxes(positions, size)
+
+
+def tiered_cake(tiers=((3, 1), (2, 1), (1, 1)), segments=48):
+    # tiers: (radius, height) from the bottom up
+    parts, y = [], 0
+    for radius, height in tiers:
+        parts.append(cylinder(radius, height, segments, y))
+        y += height
+    return merge(parts)
+
+
+GENERATORS = {
+    'disk': disk,
+    'ring': ring,
+    'cylinder': cylinder,
+    'pillar': cylinder,
+    'box': box,
+    'boxes': boxes,
+    'pillar_ring': pillar_ring,
+    'tiered_cake': tiered_cake,
+}
+
+
+# --------------------------
+# Cache
+# --------------------------
+def _key(kind, params):
+    h = hashlib.sha1(f'{VERSION}:{kind}'.encode())
+    for name in sorted(params):
+        value = params[name]
+        h.update(name.encode())
+        if isinstance(value, np.ndarray):
+            h.update(str(value.shape).encode())
+            h.update(np.ascontiguousarray(value, dtype=np.float32).tobytes())
+        else:
+            h.update(json.dumps(value).encode())
+    return f'{kind}-{h.hexdigest()[:16]}'
+
+
+def arrays(kind, persist=True, **params):
+    key = _key(kind, params)
+    if key in _memory:
+        return _memory[key]
+
+    path = os.path.join(CACHE_DIR, key + '.npz')
+    if persist and os.path.exists(path):
+        with np.load(path) as f:
+            data = f['v'], f['n'], f['t']
+    else:
+        data = GENERATORS[kind](**params)
+        if persist:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            tmp = path + '.tmp'
+            with open(tmp, 'wb') as f:
+                np.savez(f, v=data[0], n=data[1], t=data[2])
+            os.replace(tmp, path)
+
+    _memory[key] = data
+    return data
+
+
+def mesh(kind, persist=True, **params):
+    # A fresh Mesh every call (a Mesh is a scene node and can't be shared),
+    # built from the memoized arrays
+    v, n, t = arrays(kind, persist, **params)
+    m = Mesh(vertices=v.ravel(), normals=n.ravel(), triangles=t.ravel())
+    m.generated_vertices = v[t.ravel()]     # lets collider='mesh' read triangles without Vec3 lists
+    return m
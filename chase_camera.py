@@ -0,0 +1,224 @@
+# Collision-aware chase camera
+#
+# Static geometry is bucketed once into a uniform grid (StaticBroadphase).
+# Each frame the camera does a single sphere sweep from the player to where
+# it wants to be, walking only the grid cells on that segment (capped at
+# max_cells), so the cost doesn't depend on how dense the level is. The
+# result is reused while the player stands still. Solids pull the camera in;
+# decorations in the way are faded out instead. The same grid answers the
+# player's continuous-collision casts (see ccd.py).
+import math
+from collections import defaultdict
+from ursina import Vec3, camera, lerp, scene, time
+
+
+class StaticBroadphase:
+    def __init__(self, cell_size=4, padding=0.5):
+        self.cell_size = cell_size
+        self.padding = padding          # largest sweep radius queries may use
+        self.cells = defaultdict(list)
+        self.boxes = []                 # (lo, hi, entity, solid)
+        self.stamps = []                # last query that tested each box
+        self.query_id = 0
+
+    def _cell(self, x, y, z):
+        cs = self.cell_size
+        return (math.floor(x / cs), math.floor(y / cs), math.floor(z / cs))
+
+    def add(self, entity, solid=True):
+        # solid: blocks the camera; otherwise a decoration that gets faded
+        bounds = entity.get_tight_bounds(scene)
+        if bounds is not None:
+            self.add_box(tuple(bounds[0]), tuple(bounds[1]), entity, solid)
+
+    def add_box(self, lo, hi, entity=None, solid=True):
+        # World-space bounds given directly, e.g. for levels that are still plain data
+        index = len(self.boxes)
+        self.boxes.append((lo, hi, entity, solid))
+        self.stamps.append(-1)
+
+        p = self.padding
+        x0, y0, z0 = self._cell(lo[0] - p, lo[1] - p, lo[2] - p)
+        x1, y1, z1 = self._cell(hi[0] + p, hi[1] + p, hi[2] + p)
+        for x in range(x0, x1 + 1):
+            for y in range(y0, y1 + 1):
+                for z in range(z0, z1 + 1):
+                    self.cells[(x, y, z)].append(index)
+
+    def add_all(self, entities, solid=True):
+        for entity in entities:
+            self.add(entity, solid)
+
+    # --------------------------
+    # Query
+    # --------------------------
+    @staticmethod
+    def _slab(origin, d, lo, hi, r):
+        # Entry fraction of the segment into the box grown by r, or None
+        t0, t1 = 0.0, 1.0
+        for i in range(3):
+            a, b = lo[i] - r, hi[i] + r
+            if abs(d[i]) < 1e-9:
+                if origin[i] < a or origin[i] > b:
+                    return None
+                continue
+            ta, tb = (a - origin[i]) / d[i], (b - origin[i]) / d[i]
+            if ta > tb:
+                ta, tb = tb, ta
+            t0, t1 = max(t0, ta), min(t1, tb)
+            if t0 > t1:
+                return None
+        return t0
+
+    def _walk(self, origin, d, end, max_cells):
+        # Yields (fraction at which its cell was entered, box index) for every
+        # box bucketed along the segment, each once per query. If max_cells
+        # runs out first, ends with (fraction walked, None).
+        self.query_id += 1
+        qid = self.query_id
+        cs = self.cell_size
+        cell = list(self._cell(*origin))
+        last = self._cell(*end)
+        step, t_max, t_delta = [0, 0, 0], [math.inf] * 3, [math.inf] * 3
+        for i in range(3):
+            if d[i] > 0:
+                step[i] = 1
+                t_max[i] = ((cell[i] + 1) * cs - origin[i]) / d[i]
+                t_delta[i] = cs / d[i]
+            elif d[i] < 0:
+                step[i] = -1
+                t_max[i] = (cell[i] * cs - origin[i]) / d[i]
+                t_delta[i] = -cs / d[i]
+
+        t_cell = 0.0
+        for _ in range(max_cells):
+            for index in self.cells.get(tuple(cell), ()):
+                if self.stamps[index] != qid:
+                    self.stamps[index] = qid
+                    yield t_cell, index
+
+            if tuple(cell) == last:
+                return
+            axis = t_max.index(min(t_max))
+            if t_max[axis] > 1:
+                return
+            t_cell = t_max[axis]
+            cell[axis] += step[axis]
+            t_max[axis] += t_delta[axis]
+        yield t_cell, None
+
+    def sweep(self, origin, end, radius=0.4, max_cells=64):
+        # Returns (fraction of the first solid hit or None, that entity, [decorations before it])
+        radius = min(radius, self.padding)
+        origin = tuple(origin)
+        d = tuple(e - o for e, o in zip(end, origin))
+
+        hit_t, blocker, passed = None, None, []
+        for t_cell, index in self._walk(origin, d, end, max_cells):
+            if index is None or (hit_t is not None and t_cell > hit_t):
+                break
+            lo, hi, entity, solid = self.boxes[index]
+            t = self._slab(origin, d, lo, hi, radius)
+            if t is None:
+                continue
+            if solid:
+                if hit_t is None or t < hit_t:
+                    hit_t, blocker = t, entity
+            else:
+                passed.append((t, entity))
+
+        occluders = [e for t, e in passed if hit_t is None or t < hit_t]
+        return hit_t, blocker, occluders
+
+    def cast(self, origin, end, radius=0.4, skin=0.05, accept=None, max_cells=64):
+        # Time of impact of a moving sphere against solids: (fraction or None, entity).
+        # One-sided: boxes the sphere already sinks into by more than skin/2
+        # are let go, so whatever is embedded can still move out. A segment
+        # longer than max_cells is clamped where the walk stopped, with no
+        # entity, rather than reported clear.
+        radius = min(radius, self.padding)
+        origin = tuple(origin)
+        d = tuple(e - o for e, o in zip(end, origin))
+        depth = radius - skin / 2
+
+        hit_t, blocker = None, None
+        for t_cell, index in self._walk(origin, d, end, max_cells):
+            if index is None:
+                if hit_t is None or hit_t > t_cell:
+                    return t_cell, None
+                break
+            if hit_t is not None and t_cell > hit_t:
+                break
+            lo, hi, entity, solid = self.boxes[index]
+            if not solid or (accept is not None and not accept(entity)):
+                continue
+            if all(lo[i] - depth < origin[i] < hi[i] + depth for i in range(3)):
+                continue
+            t = self._slab(origin, d, lo, hi, radius)
+            if t is not None and (hit_t is None or t < hit_t):
+                hit_t, blocker = t, entity
+        return hit_t, blocker
+
+
+# --------------------------
+# Camera
+# --------------------------
+class ChaseCamera:
+    def __init__(self, target, broadphase, offset=Vec3(0, 8, -12), look_ahead=3, look_height=2,
+                 pivot_height=1, speed=6, radius=0.4, fade_alpha=0.3):
+        self.target = target
+        self.broadphase = broadphase
+        self.offset = Vec3(offset)
+        self.look_ahead = look_ahead        # how far in front of the target to look
+        self.look_height = look_height
+        self.pivot_height = pivot_height    # sweep starts here above the target
+        self.speed = speed
+        self.radius = radius
+        self.fade_alpha = fade_alpha
+
+        self.faded = {}                     # entity -> alpha before fading
+        self.queries = 0                    # sweeps actually run (the rest were cached)
+        self._key = None
+        self._result = (None, None, [])
+
+    def update(self):
+        position = self.target.world_position
+        pivot = position + Vec3(0, self.pivot_height, 0)
+        desired = position + self.offset
+
+        key = (tuple(pivot), tuple(desired))
+        if key != self._key:
+            self._key = key
+            self._result = self.broadphase.sweep(pivot, desired, self.radius)
+            self.queries += 1
+        hit_t, blocker, occluders = self._result
+
+        if hit_t is None:
+            camera.position = lerp(camera.position, desired, time.dt * self.speed)
+        else:
+            # Pull in in front of the occluder right away so we never see through it
+            goal = lerp(pivot, desired, hit_t)
+            if distance_sq(camera.position, pivot) > distance_sq(goal, pivot):
+                camera.position = goal
+            else:
+                camera.position = lerp(camera.position, goal, time.dt * self.speed)
+
+        look_target = position + self.target.forward * self.look_ahead + Vec3(0, self.look_height, 0)
+        camera.look_at(look_target)
+
+        self._fade(occluders)
+
+    def _fade(self, occluders):
+        occluding = set(occluders)
+        for entity in [e for e in self.faded if e not in occluding]:
+            if entity:
+                entity.alpha = self.faded[entity]
+            del self.faded[entity]
+        for entity in occluding:
+            if entity not in self.faded:
+                self.faded[entity] = entity.alpha
+                entity.alpha = self.fade_alpha
+
+
+def distance_sq(a, b):
+    return (a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2 + (a[2] - b[2]) ** 2
@@ -0,0 +1,79 @@
+# Slotted gameplay-state records and entity memory accounting
+#
+# Gameplay fields live in small __slots__ records hung off the engine entity
+# (entity.state) instead of in the entity's own __dict__, so per-collectible
+# state stays in the tens of bytes and can be sized against a RAM budget.
+import sys
+from collections import defaultdict
+
+
+class CoinState:
+    # Position, spin and bob live in the CoinSim arrays; this is the slot there
+    __slots__ = ('index',)
+
+    def __init__(self, index):
+        self.index = index
+
+
+class BlockState:
+    __slots__ = ('active', 'original_y', 'bounce_animation')
+
+    def __init__(self, original_y):
+        self.active = True
+        self.original_y = original_y
+        self.bounce_animation = None
+
+
+def record_size(record):
+    # Shallow size of a slotted record plus its slot values
+    size = sys.getsizeof(record)
+    for name in getattr(type(record), '__slots__', ()):
+        value = getattr(record, name, None)
+        if value is not None and not isinstance(value, bool):
+            size += sys.getsizeof(value)
+    return size
+
+
+def entity_size(entity):
+    # Python-side footprint only; Panda3D node memory is not visible here
+    size = sys.getsizeof(entity)
+    instance_dict = getattr(entity, '__dict__', None)
+    if instance_dict is not None:
+        size += sys.getsizeof(instance_dict)
+    state = getattr(entity, 'state', None)
+    if state is not None and hasattr(type(state), '__slots__'):
+        size += record_size(state)
+    return size
+
+
+# --------------------------
+# Report
+# --------------------------
+def memory_report(entities, root=None):
+    # root: scene-graph node whose whole subtree is counted (e.g. ursina's scene)
+    per_type = defaultdict(lambda: [0, 0, 0])   # count, entity bytes, state bytes
+    colliders = 0
+    textures = set()
+
+    for entity in entities:
+        row = per_type[type(entity).__name__]
+        row[0] += 1
+        row[1] += entity_size(entity)
+        state = getattr(entity, 'state', None)
+        if state is not None and hasattr(type(state), '__slots__'):
+            row[2] += record_size(state)
+        if getattr(entity, 'collider', None) is not None:
+            colliders += 1
+        texture = getattr(entity, 'texture', None)
+        if texture is not None:
+            textures.add(getattr(texture, 'name', id(texture)))
+
+    lines = [f'{"type":<16}{"count":>8}{"bytes/entity":>14}{"state bytes":>13}{"total":>12}']
+    total = 0
+    for name, (count, size, state_size) in sorted(per_type.items(), key=lambda kv: -kv[1][1]):
+        total += size
+        lines.append(f'{name:<16}{count:>8}{size // count:>14}{state_size // count:>13}{size:>12}')
+    nodes = len(root.find_all_matches('**')) if root is not None else 'n/a'
+    lines.append(f'entities: {len(entities)}  nodes: {nodes}  colliders: {colliders}  '
+                 f'textures: {len(textures)}  python bytes: {total}')
+    return '\n'.join(lines)
@@ -0,0 +1,135 @@
+# Frame-budgeted job scheduler
+#
+# Expensive work (building the world, spawning batches, level resets) is
+# submitted as a generator that yields between small units of work. Once per
+# frame run() steps the highest-priority jobs until the frame's time budget
+# is used up, so a big task is spread over as many frames as it needs instead
+# of stalling one. Per-queue wait/latency stats show how long work sat queued.
+# A job that raises is dropped and counted as failed; the frame carries on.
+import heapq, itertools, time, traceback
+
+HIGH, NORMAL, LOW = 0, 1, 2
+
+
+class Job:
+    __slots__ = ('work', 'queue', 'priority', 'submitted', 'started', 'frames', 'done', 'error')
+
+    def __init__(self, work, queue, priority, now):
+        self.work = work
+        self.queue = queue
+        self.priority = priority
+        self.submitted = now
+        self.started = None
+        self.frames = 0
+        self.done = False
+        self.error = None
+
+
+class QueueStats:
+    __slots__ = ('submitted', 'started', 'completed', 'failed', 'pending', 'wait_total', 'wait_max',
+                 'latency_total', 'latency_max', 'frames_max')
+
+    def __init__(self):
+        self.submitted = self.started = self.completed = self.failed = self.pending = 0
+        self.wait_total = self.wait_max = 0.0          # submit -> first step
+        self.latency_total = self.latency_max = 0.0    # submit -> done
+        self.frames_max = 0                            # most frames one job was spread over
+
+
+class JobScheduler:
+    def __init__(self, budget=0.004, clock=time.perf_counter):
+        self.budget = budget        # seconds of job work per frame (half of an 8 ms frame by default)
+        self.clock = clock
+        self.heap = []
+        self.order = itertools.count()
+        self.queues = {}
+        self.last_frame_time = 0.0
+
+    def submit(self, work, priority=NORMAL, queue='default'):
+        # work: a generator (yield between units) or a plain callable
+        if callable(work):
+            work = _once(work)
+        job = Job(work, queue, priority, self.clock())
+        heapq.heappush(self.heap, (priority, next(self.order), job))
+        stats = self.queues.setdefault(queue, QueueStats())
+        stats.submitted += 1
+        stats.pending += 1
+        return job
+
+    def busy(self, queue=None):
+        if queue is None:
+            return bool(self.heap)
+        stats = self.queues.get(queue)
+        return bool(stats and stats.pending)
+
+    # --------------------------
+    # Per-frame
+    # --------------------------
+    def run(self, budget=None):
+        start = self.clock()
+        deadline = start + (self.budget if budget is None else budget)
+        stepped = set()
+
+        # Always make some progress, even if a single step overruns the budget
+        now = start
+        while self.heap and (now < deadline or not stepped):
+            priority, order, job = self.heap[0]
+            stats = self.queues[job.queue]
+            if job.started is None:
+                job.started = now
+                waited = now - job.submitted
+                stats.started += 1
+                stats.wait_total += waited
+                stats.wait_max = max(stats.wait_max, waited)
+            if job not in stepped:
+                stepped.add(job)
+                job.frames += 1
+
+            try:
+                next(job.work)
+            except StopIteration:
+                self._remove(job)
+                job.done = True
+                latency = self.clock() - job.submitted
+                stats.pending -= 1
+                stats.completed += 1
+                stats.latency_total += latency
+                stats.latency_max = max(stats.latency_max, latency)
+                stats.frames_max = max(stats.frames_max, job.frames)
+            except Exception as error:
+                # Off the heap first, so a broken job can't run (or count) again
+                self._remove(job)
+                job.done = True
+                job.error = error
+                stats.pending -= 1
+                stats.failed += 1
+                print(f'job in {job.queue!r} failed:')
+                traceback.print_exc()
+            now = self.clock()
+
+        self.last_frame_time = now - start
+
+    def _remove(self, job):
+        # Usually the top; not if the step itself submitted more urgent work
+        if self.heap[0][2] is job:
+            heapq.heappop(self.heap)
+        else:
+            self.heap = [entry for entry in self.heap if entry[2] is not job]
+            heapq.heapify(self.heap)
+
+    def report(self):
+        lines = [f'{"queue":<10}{"done":>6}{"failed":>8}{"pending":>9}{"avg wait ms":>13}{"max wait ms":>13}'
+                 f'{"avg latency ms":>16}{"max latency ms":>16}{"max frames":>12}']
+        for name, s in self.queues.items():
+            lines.append(f'{name:<10}{s.completed:>6}{s.failed:>8}{s.pending:>9}'
+                         f'{s.wait_total / max(1, s.started) * 1000:>13.2f}{s.wait_max * 1000:>13.2f}'
+                         f'{s.latency_total / max(1, s.completed) * 1000:>16.2f}{s.latency_max * 1000:>16.2f}'
+                         f'{s.frames_max:>12}')
+        lines.append(f'last frame: {self.last_frame_time * 1000:.2f} ms of {self.budget * 1000:.1f} ms budget')
+        return '\n'.join(lines)
+
+
+def _once(func):
+    func()
+    return
+    yield
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# Super Mario 3D World - LAN Multiplayer Playground (client)
+# Start a server first: python netplay.py server
+from ursina import *
+from netplay import NetClient, PORT, buttons_from_keys
+from chase_camera import StaticBroadphase, ChaseCamera
+import sys
+
+host = sys.argv[1] if len(sys.argv) > 1 else '127.0.0.1'
+port = int(sys.argv[2]) if len(sys.argv) > 2 else PORT
+client = NetClient(host, port)
+client.connect()
+world = client.world
+
+app = Ursina()
+window.title = "Super Mario 3D World - LAN Multiplayer Playground"
+window.size = (1280, 720)
+window.borderless = False
+window.fps_counter.enabled = True
+
+# --------------------------
+# World (layout comes from the server's seed)
+# --------------------------
+sky = Sky(color=color.rgb(135, 206, 235))
+ground = Entity(model='plane', scale=world.size, color=color.lime)
+
+# The chase camera's static level, straight from the layout data
+broadphase = StaticBroadphase()
+broadphase.add_box((-world.size / 2, 0, -world.size / 2), (world.size / 2, 0, world.size / 2), ground)
+
+for x, y, z, sx, sy, sz in world.platforms:
+    platform = Entity(model='cube', color=color.green, scale=(sx, sy, sz), position=(x, y, z))
+    broadphase.add_box((x - sx / 2, y - sy / 2, z - sz / 2), (x + sx / 2, y + sy / 2, z + sz / 2), platform)
+
+coin_entities = [Entity(model='sphere', color=color.yellow, scale=0.5, position=p) for p in world.coins]
+block_entities = [Entity(model='cube', color=color.orange, position=p) for p in world.blocks]
+for (x, y, z), block in zip(world.blocks, block_entities):
+    broadphase.add_box((x - 0.5, y - 0.5, z - 0.5), (x + 0.5, y + 0.5, z + 0.5), block)
+
+# --------------------------
+# Players
+# --------------------------
+mario = Entity(model='cube', color=color.red, scale=(0.8, 1.6, 0.8))
+chase_cam = ChaseCamera(mario, broadphase, offset=Vec3(0, 8, -12), look_ahead=3, speed=6)
+others = {}     # player id -> Entity
+
+# --------------------------
+# UI Elements
+# --------------------------
+coin_text = Text(text='Coins: 0', position=(-0.8, 0.45), scale=2, color=color.yellow)
+net_text = Text(text='', position=(-0.8, 0.4), scale=1.5, color=color.white)
+
+tick_time = 0
+
+def update():
+    global tick_time
+
+    # Snapshots in, then one input per server tick (predicted locally)
+    client.poll()
+    tick_time += time.dt
+    step = 1 / client.tick_rate
+    while tick_time >= step:
+        tick_time -= step
+        client.send_input(buttons_from_keys(held_keys))
+
+    s = client.state
+    mario.position = (s.x, s.y, s.z)
+    mario.rotation_y = s.rotation_y
+    coin_text.text = f'Coins: {s.coins}'
+
+    for pid, (x, y, z, rotation_y, coins) in client.others.items():
+        other = others.get(pid)
+        if other is None:
+            other = others[pid] = Entity(model='cube', color=color.azure, scale=(0.8, 1.6, 0.8), position=(x, y, z))
+        other.position = lerp(other.position, Vec3(x, y, z), min(1, time.dt * 15))
+        other.rotation_y = rotation_y
+    for pid in [pid for pid in others if pid not in client.others]:
+        destroy(others.pop(pid))
+
+    for i, coin in enumerate(coin_entities):
+        coin.enabled = bool(client.coins >> i & 1)
+        coin.rotation_y += time.dt * 100
+    for i, block in enumerate(block_entities):
+        block.color = color.orange if client.blocks >> i & 1 else color.gray
+
+    net_text.text = f'players: {len(client.others) + 1} | in {client.bytes_in / 1024:.0f} KB | corrections {client.corrections}'
+
+    # Same chase cam as the single-player playground
+    chase_cam.update()
+
+def input(key):
+    if key == 'escape':
+        application.quit()
+
+if __name__ == '__main__':
+    print(f"Connected to {host}:{port} as player {client.id}")
+    print("Controls: W/S forward/back, A/D turn, SPACE to jump, SHIFT to run")
+    app.run()
@@ -0,0 +1,516 @@
+#!/usr/bin/env python3
+# LAN multiplayer for the open-world playground
+#
+#   python netplay.py server [port]                    authoritative server on loopback
+#   python netplay.py bots 32 [host] [port] [seconds]  headless load-test clients
+#   python multiplayer.py [host] [port]                the playable client
+#
+# The server simulates every Mario, the coins and the question blocks at a
+# fixed tick over UDP. Clients send button states each tick and predict their
+# own Mario with the same step_player(); the server answers with binary
+# snapshots that only carry what changed since the last snapshot that
+# client acknowledged.
+import asyncio, math, random, select, socket, struct, sys, time
+from collections import deque
+
+PORT = 6464
+TICK_RATE = 30
+MAX_INPUTS_PER_TICK = 3      # stops a client from fast-forwarding itself
+MAX_PLAYERS = 255            # player counts travel as one byte
+TIMEOUT = 5                  # seconds of silence before a client is dropped
+HISTORY = 2 * TICK_RATE      # snapshots kept as delta baselines
+NO_BASE = 0xFFFFFFFF
+
+# Packet types
+JOIN, WELCOME, INPUT, SNAPSHOT = 1, 2, 3, 4
+
+# Button bits
+W, S, A, D, JUMP, RUN = 1, 2, 4, 8, 16, 32
+
+# Same tuning as Mario in 0.py
+SPEED = 7
+JUMP_POWER = 10
+GRAVITY = 30
+TURN_SPEED = 180
+SPAWN = (0, 10, 0)
+
+# Positions travel as int16 in 1/64 units, rotation as uint16 over 360 degrees
+POS_SCALE = 64
+ROT_SCALE = 65536 / 360
+FIELD_FORMATS = ('h', 'h', 'h', 'H', 'B')    # x, y, z, rotation_y, coins
+
+
+# --------------------------
+# Shared world and player simulation
+# --------------------------
+class World:
+    # Layout mirrors 0.py's counts and ranges, generated from a seed so the
+    # server and every client agree on it
+    def __init__(self, seed, size=80):
+        rng = random.Random(seed)
+        self.seed = seed
+        self.size = size
+        self.platforms = [(rng.randint(-15, 15), height, rng.randint(-15, 15), 5, 0.5, 3)
+                          for height in (3, 5, 8) for i in range(3)]
+        self.coins = [(rng.randint(-35, 35), 2, rng.randint(-35, 35)) for i in range(20)]
+        self.blocks = [(rng.randint(-30, 30), 3, rng.randint(-30, 30)) for i in range(10)]
+        # Solid boxes as (center x, y, z, half extents x, y, z)
+        self.solids = ([(x, y, z, sx / 2, sy / 2, sz / 2) for x, y, z, sx, sy, sz in self.platforms]
+                       + [(x, y, z, 0.5, 0.5, 0.5) for x, y, z in self.blocks])
+
+    def ground_height(self, x, y, z, fallen=0.0):
+        # What Mario's 1.2-unit downward ray from y + 0.1 would hit, or None.
+        # fallen: how far he dropped this tick; the ray then starts where he
+        # was, so a fast fall can't pass through a platform between ticks
+        top, low, high = None, y + 0.1 - 1.2, y + 0.1 + fallen
+        half = self.size / 2
+        if abs(x) <= half and abs(z) <= half and low <= 0 <= high:
+            top = 0
+        for cx, cy, cz, hx, hy, hz in self.solids:
+            surface = cy + hy
+            if low <= surface <= high and abs(x - cx) <= hx and abs(z - cz) <= hz:
+                if top is None or surface > top:
+                    top = surface
+        return top
+
+    def block_above(self, x, y, z, active):
+        head = y + 0.8
+        for i, (cx, cy, cz) in enumerate(self.blocks):
+            if active >> i & 1 and head <= cy - 0.5 <= head + 0.5 and abs(x - cx) <= 0.5 and abs(z - cz) <= 0.5:
+                return i
+        return None
+
+
+class PlayerState:
+    __slots__ = ('x', 'y', 'z', 'rotation_y', 'y_vel', 'grounded', 'coins')
+
+    def __init__(self):
+        self.x, self.y, self.z = SPAWN
+        self.rotation_y = 0.0
+        self.y_vel = 0.0
+        self.grounded = False
+        self.coins = 0
+
+
+def step_player(p, buttons, dt, world, blocks_active):
+    # Mario.update from 0.py without the engine; returns the index of a block
+    # hit from below, if any
+    turn = bool(buttons & A) - bool(buttons & D)
+    p.rotation_y = (p.rotation_y + turn * TURN_SPEED * dt) % 360
+
+    speed = SPEED * (1.5 if buttons & RUN else 1.0)
+    forward = bool(buttons & W) - bool(buttons & S)
+    angle = math.radians(p.rotation_y)
+    p.x += math.sin(angle) * forward * speed * dt
+    p.z += math.cos(angle) * forward * speed * dt
+
+    if p.grounded and buttons & JUMP:
+        p.y_vel = JUMP_POWER
+        p.grounded = False
+
+    hit_block = None
+    if p.y_vel > 0:
+        hit_block = world.block_above(p.x, p.y, p.z, blocks_active)
+        if hit_block is not None:
+            p.y_vel *= -0.5
+
+    p.y_vel -= GRAVITY * dt
+    dy = p.y_vel * dt
+    p.y += dy
+
+    ground = world.ground_height(p.x, p.y, p.z, max(0.0, -dy))
+    if ground is not None:
+        p.grounded = True
+        p.y = ground + 0.8
+        p.y_vel = max(0, p.y_vel)
+    else:
+        p.grounded = False
+
+    # Water death plane
+    if p.y < -10:
+        p.x, p.y, p.z = SPAWN
+        p.y_vel = 0
+    return hit_block
+
+
+def touching_coin(p, coin):
+    # Mario's box (0.8 x 1.6 x 0.8) against a 0.5 coin
+    return abs(p.x - coin[0]) < 0.65 and abs(p.y - coin[1]) < 1.05 and abs(p.z - coin[2]) < 0.65
+
+
+def seq_newer(a, b):
+    return a != b and (a - b) & 0xFFFF < 0x8000
+
+
+def quantize(p):
+    clamp = lambda v: max(-32768, min(32767, round(v * POS_SCALE)))
+    return (clamp(p.x), clamp(p.y), clamp(p.z), round(p.rotation_y * ROT_SCALE) & 0xFFFF, min(p.coins, 255))
+
+
+def dequantize(q):
+    return q[0] / POS_SCALE, q[1] / POS_SCALE, q[2] / POS_SCALE, q[3] / ROT_SCALE, q[4]
+
+
+# --------------------------
+# Snapshot encoding
+# --------------------------
+# A snapshot is (players {id: quantized tuple}, coin bitmask, block bitmask).
+# A packet is a small per-client header (tick, baseline, own exact state for
+# prediction) followed by a delta body holding only the players/fields that
+# differ from the baseline. The body depends on nothing but the baseline, so
+# the server encodes it once per distinct baseline, not once per client.
+def encode_header(tick, base_tick, last_seq, own):
+    return (struct.pack('<BIIH', SNAPSHOT, tick, base_tick, last_seq)
+            + struct.pack('<5f?B', own.x, own.y, own.z, own.rotation_y, own.y_vel, own.grounded, min(own.coins, 255)))
+
+
+def encode_delta(base, current, coin_bytes, block_bytes):
+    base_players, base_coins, base_blocks = base if base else ({}, None, None)
+    players, coins, blocks = current
+
+    changed = []
+    for pid, values in players.items():
+        old = base_players.get(pid)
+        mask = 0
+        for i, value in enumerate(values):
+            if old is None or old[i] != value:
+                mask |= 1 << i
+        if mask:
+            changed.append((pid, mask, values))
+    removed = [pid for pid in base_players if pid not in players]
+
+    out = [struct.pack('<B', len(changed))]
+    for pid, mask, values in changed:
+        out.append(struct.pack('<BB', pid, mask))
+        fmt = '<' + ''.join(FIELD_FORMATS[i] for i in range(5) if mask >> i & 1)
+        out.append(struct.pack(fmt, *(values[i] for i in range(5) if mask >> i & 1)))
+    out.append(struct.pack('<B', len(removed)) + bytes(removed))
+
+    flags = (coins != base_coins) | (blocks != base_blocks) << 1
+    out.append(struct.pack('<B', flags))
+    if flags & 1:
+        out.append(coins.to_bytes(coin_bytes, 'little'))
+    if flags & 2:
+        out.append(blocks.to_bytes(block_bytes, 'little'))
+    return b''.join(out)
+
+
+def decode_snapshot(data, bases, coin_bytes, block_bytes):
+    # Returns (tick, last_seq, own tuple, snapshot) or None if the baseline is gone
+    _, tick, base_tick, last_seq = struct.unpack_from('<BIIH', data)
+    offset = struct.calcsize('<BIIH')
+    own = struct.unpack_from('<5f?B', data, offset)
+    offset += struct.calcsize('<5f?B')
+
+    if base_tick == NO_BASE:
+        base = ({}, 0, 0)
+    elif base_tick in bases:
+        base = bases[base_tick]
+    else:
+        return None
+    players = dict(base[0])
+
+    (count,) = struct.unpack_from('<B', data, offset)
+    offset += 1
+    for _ in range(count):
+        pid, mask = struct.unpack_from('<BB', data, offset)
+        offset += 2
+        fmt = '<' + ''.join(FIELD_FORMATS[i] for i in range(5) if mask >> i & 1)
+        fields = iter(struct.unpack_from(fmt, data, offset))
+        offset += struct.calcsize(fmt)
+        old = players.get(pid, (0, 0, 0, 0, 0))
+        players[pid] = tuple(next(fields) if mask >> i & 1 else old[i] for i in range(5))
+
+    (count,) = struct.unpack_from('<B', data, offset)
+    for pid in data[offset + 1:offset + 1 + count]:
+        players.pop(pid, None)
+    offset += 1 + count
+
+    coins, blocks = base[1], base[2]
+    flags = data[offset]
+    offset += 1
+    if flags & 1:
+        coins = int.from_bytes(data[offset:offset + coin_bytes], 'little')
+        offset += coin_bytes
+    if flags & 2:
+        blocks = int.from_bytes(data[offset:offset + block_bytes], 'little')
+    return tick, last_seq, own, (players, coins, blocks)
+
+
+# --------------------------
+# Server
+# --------------------------
+class RemotePlayer:
+    def __init__(self, pid, address, now):
+        self.id = pid
+        self.address = address
+        self.state = PlayerState()
+        self.inputs = deque()
+        self.last_seq = 0
+        self.ack_tick = NO_BASE
+        self.last_heard = now
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+
+class Server(asyncio.DatagramProtocol):
+    def __init__(self, seed=None, tick_rate=TICK_RATE):
+        self.world = World(random.randrange(1 << 32) if seed is None else seed)
+        self.tick_rate = tick_rate
+        self.tick = 0
+        self.players = {}                       # address -> RemotePlayer
+        self.coins = (1 << len(self.world.coins)) - 1
+        self.blocks = (1 << len(self.world.blocks)) - 1
+        self.coin_bytes = (len(self.world.coins) + 7) // 8
+        self.block_bytes = (len(self.world.blocks) + 7) // 8
+        self.history = {}
+        self.transport = None
+
+        # Stats, reset every report
+        self.sim_time = 0.0
+        self.ticks_since_report = 0
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, address):
+        if not data:
+            return
+        now = time.monotonic()
+        player = self.players.get(address)
+
+        if data[0] == JOIN:
+            if player is None:
+                used = {p.id for p in self.players.values()}
+                free = [i for i in range(MAX_PLAYERS) if i not in used]
+                if not free:
+                    return
+                player = self.players[address] = RemotePlayer(free[0], address, now)
+            self.transport.sendto(struct.pack('<BBIB', WELCOME, player.id, self.world.seed, self.tick_rate), address)
+
+        elif data[0] == INPUT and player is not None:
+            player.last_heard = now
+            player.bytes_in += len(data)
+            _, ack_tick, count = struct.unpack_from('<BIB', data)
+            if ack_tick in self.history:
+                player.ack_tick = ack_tick
+            newest = player.inputs[-1][0] if player.inputs else player.last_seq
+            for seq, buttons in struct.iter_unpack('<HB', data[6:6 + 3 * count]):
+                if seq_newer(seq, newest):
+                    player.inputs.append((seq, buttons))
+                    newest = seq
+
+    def step(self):
+        started = time.perf_counter()
+        self.tick += 1
+        dt = 1 / self.tick_rate
+        now = time.monotonic()
+
+        for address in [a for a, p in self.players.items() if now - p.last_heard > TIMEOUT]:
+            del self.players[address]
+
+        for player in self.players.values():
+            for _ in range(min(MAX_INPUTS_PER_TICK, len(player.inputs))):
+                seq, buttons = player.inputs.popleft()
+                hit = step_player(player.state, buttons, dt, self.world, self.blocks)
+                if hit is not None:
+                    self.blocks &= ~(1 << hit)
+                player.last_seq = seq
+
+            if self.coins:
+                for i, coin in enumerate(self.world.coins):
+                    if self.coins >> i & 1 and touching_coin(player.state, coin):
+                        self.coins &= ~(1 << i)
+                        player.state.coins += 1
+
+        snapshot = ({p.id: quantize(p.state) for p in self.players.values()}, self.coins, self.blocks)
+        self.history[self.tick] = snapshot
+        self.history.pop(self.tick - HISTORY, None)
+
+        bodies = {}                             # baseline tick -> encoded delta
+        for player in self.players.values():
+            base = self.history.get(player.ack_tick)
+            base_tick = player.ack_tick if base else NO_BASE
+            body = bodies.get(base_tick)
+            if body is None:
+                body = bodies[base_tick] = encode_delta(base, snapshot, self.coin_bytes, self.block_bytes)
+            packet = encode_header(self.tick, base_tick, player.last_seq, player.state) + body
+            player.bytes_out += len(packet)
+            self.transport.sendto(packet, player.address)
+
+        self.sim_time += time.perf_counter() - started
+        self.ticks_since_report += 1
+
+    def report(self, seconds):
+        n = len(self.players)
+        cpu_ms = self.sim_time / max(1, self.ticks_since_report) * 1000
+        out = sum(p.bytes_out for p in self.players.values())
+        inp = sum(p.bytes_in for p in self.players.values())
+        line = f'tick {self.tick} | {n} players | cpu {cpu_ms:.2f} ms/tick'
+        if n:
+            line += (f' ({cpu_ms * 1000 / n:.0f} us/player)'
+                     f' | out {out / n / seconds / 1024:.1f} KB/s/player'
+                     f' | in {inp / n / seconds / 1024:.2f} KB/s/player')
+        print(line)
+        for p in self.players.values():
+            p.bytes_in = p.bytes_out = 0
+        self.sim_time = 0.0
+        self.ticks_since_report = 0
+
+    async def run(self, host='127.0.0.1', port=PORT, report_every=5):
+        loop = asyncio.get_running_loop()
+        await loop.create_datagram_endpoint(lambda: self, local_addr=(host, port))
+        print(f'server on {host}:{port}, seed {self.world.seed}, {self.tick_rate} Hz')
+        dt = 1 / self.tick_rate
+        next_tick = next_report = loop.time()
+        while True:
+            self.step()
+            next_tick += dt
+            if loop.time() >= next_report + report_every:
+                self.report(report_every)
+                next_report = loop.time()
+            await asyncio.sleep(max(0, next_tick - loop.time()))
+
+
+# --------------------------
+# Client with prediction
+# --------------------------
+class NetClient:
+    # Non-blocking, polled once per frame so it fits ursina's update loop
+    def __init__(self, host='127.0.0.1', port=PORT):
+        self.address = (host, port)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setblocking(False)
+
+        self.id = None
+        self.world = None
+        self.tick_rate = TICK_RATE
+        self.state = PlayerState()              # predicted local Mario
+        self.pending = deque()                  # inputs the server hasn't applied yet
+        self.seq = 0
+        self.ack_tick = NO_BASE
+        self.snapshots = {}                     # tick -> decoded snapshot, for delta bases
+        self.others = {}                        # id -> (x, y, z, rotation_y, coins)
+        self.coins = 0
+        self.blocks = 0
+
+        self.bytes_in = 0
+        self.corrections = 0                    # times prediction disagreed with the server
+
+    def connect(self, timeout=3):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            self.sock.sendto(bytes((JOIN,)), self.address)
+            ready, _, _ = select.select([self.sock], [], [], 0.25)
+            if ready:
+                data = self.sock.recv(2048)
+                if data and data[0] == WELCOME:
+                    _, self.id, seed, self.tick_rate = struct.unpack('<BBIB', data)
+                    self.world = World(seed)
+                    self.coins = (1 << len(self.world.coins)) - 1
+                    self.blocks = (1 << len(self.world.blocks)) - 1
+                    return True
+        raise ConnectionError(f'no server at {self.address[0]}:{self.address[1]}')
+
+    def send_input(self, buttons):
+        # One call per client tick: predict locally, then tell the server
+        self.seq = (self.seq + 1) & 0xFFFF
+        self.pending.append((self.seq, buttons))
+        step_player(self.state, buttons, 1 / self.tick_rate, self.world, self.blocks)
+
+        recent = list(self.pending)[-3:]        # resend a few in case of loss
+        packet = struct.pack('<BIB', INPUT, self.ack_tick, len(recent))
+        packet += b''.join(struct.pack('<HB', seq, b) for seq, b in recent)
+        self.sock.sendto(packet, self.address)
+
+    def poll(self):
+        while True:
+            try:
+                data = self.sock.recv(65536)
+            except (BlockingIOError, ConnectionRefusedError):
+                return
+            self.bytes_in += len(data)
+            if data and data[0] == SNAPSHOT:
+                self._receive(data)
+
+    def _receive(self, data):
+        decoded = decode_snapshot(data, self.snapshots, (len(self.world.coins) + 7) // 8,
+                                  (len(self.world.blocks) + 7) // 8)
+        if decoded is None:
+            return
+        tick, last_seq, own, snapshot = decoded
+        if self.ack_tick != NO_BASE and tick <= self.ack_tick:
+            return                              # late or duplicate
+        self.ack_tick = tick
+        self.snapshots[tick] = snapshot
+        self.snapshots.pop(tick - HISTORY, None)
+
+        players, self.coins, self.blocks = snapshot
+        self.others = {pid: dequantize(q) for pid, q in players.items() if pid != self.id}
+
+        # Reconcile: start from the server's state and replay what it hasn't seen
+        predicted = (self.state.x, self.state.y, self.state.z)
+        s = self.state
+        s.x, s.y, s.z, s.rotation_y, s.y_vel, s.grounded, s.coins = own
+        while self.pending and not seq_newer(self.pending[0][0], last_seq):
+            self.pending.popleft()
+        dt = 1 / self.tick_rate
+        for seq, buttons in self.pending:
+            step_player(s, buttons, dt, self.world, self.blocks)
+        if (s.x - predicted[0]) ** 2 + (s.y - predicted[1]) ** 2 + (s.z - predicted[2]) ** 2 > 1e-4:
+            self.corrections += 1
+
+
+def buttons_from_keys(held_keys):
+    return ((W if held_keys['w'] else 0) | (S if held_keys['s'] else 0)
+            | (A if held_keys['a'] else 0) | (D if held_keys['d'] else 0)
+            | (JUMP if held_keys['space'] else 0) | (RUN if held_keys['shift'] else 0))
+
+
+# --------------------------
+# Load test
+# --------------------------
+def run_bots(count, host='127.0.0.1', port=PORT, seconds=20):
+    bots = []
+    for i in range(count):
+        bot = NetClient(host, port)
+        bot.connect()
+        bots.append(bot)
+    print(f'{count} bots connected to {host}:{port}')
+
+    rng = random.Random()
+    buttons = [W] * count
+    dt = 1 / bots[0].tick_rate
+    started = next_tick = time.monotonic()
+    while time.monotonic() - started < seconds:
+        for i, bot in enumerate(bots):
+            bot.poll()
+            if rng.random() < 0.05:     # wander: change buttons now and then
+                buttons[i] = rng.choice((W, W | A, W | D, W | RUN, W | JUMP, JUMP, 0))
+            bot.send_input(buttons[i])
+        next_tick += dt
+        time.sleep(max(0, next_tick - time.monotonic()))
+
+    elapsed = time.monotonic() - started
+    received = sum(b.bytes_in for b in bots)
+    corrections = sum(b.corrections for b in bots)
+    print(f'in {received / count / elapsed / 1024:.1f} KB/s per bot | '
+          f'{corrections / count / elapsed:.2f} prediction corrections/s per bot')
+
+
+if __name__ == '__main__':
+    command = sys.argv[1] if len(sys.argv) > 1 else 'server'
+    if command == 'server':
+        port = int(sys.argv[2]) if len(sys.argv) > 2 else PORT
+        try:
+            asyncio.run(Server().run(port=port))
+        except KeyboardInterrupt:
+            pass
+    elif command == 'bots':
+        count = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+        host = sys.argv[3] if len(sys.argv) > 3 else '127.0.0.1'
+        port = int(sys.argv[4]) if len(sys.argv) > 4 else PORT
+        seconds = float(sys.argv[5]) if len(sys.argv) > 5 else 20
+        run_bots(count, host, port, seconds)
+    else:
+        print('usage: netplay.py server [port] | bots [count] [host] [port] [seconds]')
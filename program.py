@@ -1,6 +1,7 @@
 from ursina import *
 from ursina.prefabs.first_person_controller import FirstPersonController
 from ursina.shaders import lit_with_shadows_shader
+from shadows import ShadowBudget
 import random
 
 app = Ursina()
@@ -58,6 +59,11 @@ sun = DirectionalLight()
 sun.look_at(Vec3(1,-1,-1))
 Sky()
 
+# Shadows: fitted to the view, re-rendered only when a caster changes
+shadows = ShadowBudget(sun, resolution=1024, distance=32, update_rate=15)
+shadows.cast(ground, False)  # flat ground only receives
+shadows.add_dynamic(player)
+
 def update():
     global stars_collected
     
@@ -65,6 +71,7 @@ def update():
     for star in stars[:]:  # Use slice to avoid modification during iteration
         if distance(player.position, star.position) < 2:
             stars.remove(star)
+            shadows.remove(star)
             destroy(star)
             stars_collected += 1
             score_text.text = f'Stars: {stars_collected}/{total_stars}'
@@ -72,6 +79,8 @@ def update():
             if stars_collected >= total_stars:
                 Text('You collected all stars! Mario wins!', origin=(0,0), scale=3, color=color.gold, duration=5)
     
+    shadows.update()
+
     # Basic win/exit
     if held_keys['escape']:
         quit()
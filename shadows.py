@@ -0,0 +1,119 @@
+# Shadow budget for DirectionalLight scenes
+#
+# Fits the light's shadow frustum to the part of the level the camera can see
+# (out to `distance`) instead of the whole level, snaps it to whole shadow-map
+# texels so it doesn't shimmer, and only re-renders the shadow map when
+# something that casts actually changed. A static level therefore costs one
+# shadow pass, however large it is.
+import math
+from ursina import Vec2, camera, time
+from ursina.shaders import lit_with_shadows_shader, basic_lighting_shader
+
+# Camera mask ursina gives DirectionalLight's shadow camera; hiding an entity
+# from it removes it from the shadow pass while the main camera still sees it.
+CASTER_MASK = 0b0001
+
+
+class ShadowBudget:
+    def __init__(self, light, resolution=1024, distance=30, depth=60, update_rate=15):
+        self.light = light
+        self.resolution = resolution    # shadow map is resolution x resolution
+        self.distance = distance        # how far in front of the camera shadows reach
+        self.depth = depth              # near/far span of the light's lens
+        self.update_rate = update_rate  # max re-renders per second for moving casters
+
+        self.dynamic = []               # casters that can move: [(entity, last transform)]
+        self.dirty = True
+        self.center = None
+        self.since_render = math.inf
+        self.renders = 0                # shadow passes actually drawn
+
+        # The budget owns the shadow bounds: ursina's whole-scene fit (which it
+        # also runs once, a frame after the light is created) just forces a refit.
+        light.update_bounds = self.refit
+        light.shadow_map_resolution = Vec2(resolution, resolution)
+        light.shadows = True
+
+    # --------------------------
+    # Per-entity flags
+    # --------------------------
+    def cast(self, entity, enabled=True):
+        if enabled:
+            entity.show(CASTER_MASK)
+        else:
+            entity.hide(CASTER_MASK)
+        self.dirty = True
+
+    def receive(self, entity, enabled=True):
+        entity.shader = lit_with_shadows_shader if enabled else basic_lighting_shader
+
+    def add_dynamic(self, entity):
+        self.dynamic.append([entity, self._transform(entity)])
+
+    def remove(self, entity):
+        # Call before destroying a caster so the map drops it
+        self.dynamic = [d for d in self.dynamic if d[0] is not entity]
+        self.dirty = True
+
+    def mark_dirty(self):
+        self.dirty = True
+
+    def refit(self, entity=None):
+        self.center = None
+        self.dirty = True
+
+    @staticmethod
+    def _transform(entity):
+        return (tuple(entity.world_position), tuple(entity.world_rotation), tuple(entity.world_scale))
+
+    # --------------------------
+    # Frustum fitting
+    # --------------------------
+    def _fit(self):
+        # Centre of the visible slice, snapped to shadow-map texels in light space
+        focus = camera.world_position + camera.forward * (self.distance / 2)
+        right, up, forward = self.light.right, self.light.up, self.light.forward
+        texel = self.distance / self.resolution
+        step = self.depth / 16
+        x = math.floor(focus.dot(right) / texel) * texel
+        y = math.floor(focus.dot(up) / texel) * texel
+        z = math.floor(focus.dot(forward) / step) * step
+        return right * x + up * y + forward * z
+
+    def _place(self, center):
+        lens = self.light._light.get_lens()
+        lens.set_film_offset(0, 0)
+        lens.set_film_size(self.distance, self.distance)
+        lens.set_near_far(0, self.depth)
+        self.light.world_position = center - self.light.forward * (self.depth / 2)
+
+    # --------------------------
+    # Per-frame
+    # --------------------------
+    def update(self):
+        self.since_render += time.dt
+        node = self.light._light
+
+        # Within the update-rate budget only an explicit change forces a pass
+        if not self.dirty and self.since_render < 1 / self.update_rate:
+            node.set_active(False)
+            return
+
+        center = self._fit()
+        if self.center is None or (center - self.center).length() > 1e-6:
+            self.center = center
+            self._place(center)
+            self.dirty = True
+
+        for d in self.dynamic:
+            transform = self._transform(d[0])
+            if transform != d[1]:
+                d[1] = transform
+                self.dirty = True
+
+        render = self.dirty
+        node.set_active(render)
+        if render:
+            self.dirty = False
+            self.since_render = 0
+            self.renders += 1
@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 # Super Mario 3D World - Open World Playground (Solid Ground)
 from ursina import *
+from chase_camera import StaticBroadphase, ChaseCamera
+from ccd import SweptCapsule
 import random, math
 
 app = Ursina()
@@ -72,9 +74,12 @@ class Mario(Entity):
                 # Simple jump sound effect
                 Audio('pop', pitch=1.5, volume=0.3)
         
-        # Gravity
+        # Gravity; falls are swept so a long frame can't skip a thin platform
         self.y_vel -= self.gravity * time.dt
-        self.y += self.y_vel * time.dt
+        dy = self.y_vel * time.dt
+        if dy < 0:
+            dy, _ = capsule.move_y(self.position, dy)
+        self.y += dy
         
         # Ground check with better collision
         hit = raycast(
@@ -152,6 +157,8 @@ class QuestionBlock(Entity):
 # Enhanced Terrain
 # --------------------------
 def create_enhanced_terrain(size=40):
+    solids = []
+
     # Main ground
     ground = Entity(
         model='plane',
@@ -160,6 +167,7 @@ def create_enhanced_terrain(size=40):
         position=(0, 0, 0),
         collider='mesh'
     )
+    solids.append(ground)
     
     # Add some platforms at different heights
     platform_heights = [3, 5, 8]
@@ -172,6 +180,7 @@ def create_enhanced_terrain(size=40):
                 position=(random.randint(-15, 15), height, random.randint(-15, 15)),
                 collider='box'
             )
+            solids.append(platform)
     
     # Add some hills
     for i in range(10):
@@ -183,11 +192,16 @@ def create_enhanced_terrain(size=40):
             collider='sphere'
         )
         hill.y = hill.scale_y / 2  # Position on ground
+        solids.append(hill)
+
+    return solids
 
 # --------------------------
 # Environment Decorations
 # --------------------------
 def create_environment():
+    trunks, decorations = [], []
+
     # Trees with better appearance
     for i in range(30):
         trunk_height = random.uniform(2, 4)
@@ -205,6 +219,8 @@ def create_environment():
             scale=random.uniform(2, 4),
             position=tree_trunk.position + (0, trunk_height, 0)
         )
+        trunks.append(tree_trunk)
+        decorations.append(tree_top)
     
     # Flowers and bushes
     for i in range(50):
@@ -215,6 +231,9 @@ def create_environment():
             position=(random.randint(-38, 38), 0.5, random.randint(-38, 38))
         )
         bush.y = bush.scale_y / 2
+        decorations.append(bush)
+
+    return trunks, decorations
 
 # --------------------------
 # UI Elements
@@ -242,8 +261,8 @@ class GameUI:
 sky = Sky(color=color.rgb(135, 206, 235))
 
 # Create world
-create_enhanced_terrain(80)
-create_environment()
+terrain_solids = create_enhanced_terrain(80)
+tree_trunks, decorations = create_environment()
 
 # Create Mario
 mario = Mario(position=(0, 5, 0))
@@ -271,6 +290,14 @@ for i in range(10):
 # Setup UI
 game_ui = GameUI()
 
+# Chase camera: one swept query per frame against the static level, which
+# Mario's falls are swept against too
+broadphase = StaticBroadphase()
+broadphase.add_all(terrain_solids + tree_trunks + question_blocks)
+broadphase.add_all(decorations, solid=False)  # faded when in the way
+capsule = SweptCapsule(broadphase)
+chase_cam = ChaseCamera(mario, broadphase, offset=Vec3(0, 8, -12), look_ahead=3, speed=6)
+
 # --------------------------
 # Collision Detection
 # --------------------------
@@ -289,13 +316,8 @@ def update():
         if block.active and mario.y > block.y + 0.5 and abs(mario.x - block.x) < 1 and abs(mario.z - block.z) < 1:
             block.hit()
     
-    # Smooth chase cam with better angles
-    target_position = mario.position + Vec3(0, 8, -12)
-    camera.position = lerp(camera.position, target_position, time.dt * 6)
-    
-    # Make camera look slightly ahead of Mario
-    look_target = mario.position + mario.forward * 3 + Vec3(0, 2, 0)
-    camera.look_at(look_target)
+    # Smooth chase cam that pulls in behind occluders, looking slightly ahead of Mario
+    chase_cam.update()
     
     # Water death plane
     if mario.y < -10:
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+# Randomized stress levels and scaling benchmarks
+#
+#   python stress.py                                  data subsystems, 10^2 .. 10^6 objects
+#   python stress.py --subsystems engine --max 5      ursina entities (opens a window)
+#   python stress.py --subsystems gameplay --max 4    the scripts' per-entity update() code
+#   python stress.py --kinds coins,grid --steps 2     only some kinds, 1x and 3x per decade
+#
+# generate_level() scatters N objects of each kind at the same density the
+# playground scripts use, so the area grows with N. Every subsystem is then
+# built and stepped at each size, recording build time, memory and per-frame
+# cost. Results go to bench_output.txt, and to bench_output.png when
+# matplotlib is installed. A subsystem/kind pair stops growing once one build
+# takes longer than --limit seconds -- that's where it breaks. Each series
+# starts with an untimed warm-up build, so first-call costs don't skew it.
+import argparse, itertools, math, os, random, time, tracemalloc
+import numpy as np
+from ursina import Entity, color, destroy
+import cake_meshes
+from chase_camera import StaticBroadphase
+from sim_thread import CoinSim, TransformBuffer
+from timers import Scheduler
+
+# Objects per square unit, from the hard-coded counts in the scripts
+DENSITY = {
+    'coins': 20 / 70**2,        # 0.py: 20 coins over +-35
+    'blocks': 10 / 60**2,       # 0.py: 10 question blocks over +-30
+    'trees': 30 / 70**2,        # 0.py: 30 trees over +-35
+    'bushes': 50 / 76**2,       # 0.py: 50 bushes over +-38
+    'platforms': 20 / 40**2,    # program.py: 20 platforms over +-20
+    'grid': 1.0,                # 1-1.py: one ground block per unit
+}
+KINDS = tuple(DENSITY)
+
+
+# --------------------------
+# Level generator
+# --------------------------
+def generate_level(count, kind, seed=0):
+    # (positions (n,3), scales (n,3)) for `count` objects of `kind`
+    rng = np.random.default_rng(seed)
+    half = math.sqrt(count / DENSITY[kind]) / 2
+
+    if kind == 'grid':
+        side = math.ceil(math.sqrt(count))
+        i = np.arange(count)
+        positions = np.stack((i % side - side // 2, np.zeros(count), i // side - side // 2), axis=1)
+        return positions.astype(np.float32), np.ones((count, 3), dtype=np.float32)
+
+    xz = rng.uniform(-half, half, (count, 2))
+    scales = np.ones((count, 3))
+    y = np.zeros(count)
+    if kind == 'coins':
+        y[:] = 2
+        scales *= 0.5
+    elif kind == 'blocks':
+        y[:] = 3
+    elif kind == 'trees':
+        height = rng.uniform(2, 4, count)
+        scales[:, 0] = scales[:, 2] = 0.5
+        scales[:, 1] = height
+        y = height / 2
+    elif kind == 'bushes':
+        scales *= rng.uniform(0.5, 1.5, (count, 1))
+        y = scales[:, 1] / 2
+    elif kind == 'platforms':
+        scales[:] = np.stack((rng.uniform(2, 5, count), rng.uniform(0.5, 1, count), rng.uniform(2, 5, count)), axis=1)
+        y = rng.uniform(0, 5, count)
+    positions = np.stack((xz[:, 0], y, xz[:, 1]), axis=1)
+    return positions.astype(np.float32), scales.astype(np.float32)
+
+
+# --------------------------
+# Subsystems: each takes a level and returns (what it built, step); step() is one frame's work
+# --------------------------
+def bench_broadphase(positions, scales):
+    broadphase = StaticBroadphase()
+    lo, hi = (positions - scales / 2).tolist(), (positions + scales / 2).tolist()
+    for a, b in zip(lo, hi):
+        broadphase.add_box(tuple(a), tuple(b))
+
+    # One chase-camera sweep per frame, from a different object each time
+    rng = random.Random(1)
+    starts = itertools.cycle([positions[rng.randrange(len(positions))].tolist() for _ in range(64)])
+    def step():
+        x, y, z = next(starts)
+        broadphase.sweep((x, y + 1, z), (x, y + 8, z - 12))
+    return broadphase, step
+
+
+def bench_timers(positions, scales):
+    scheduler = Scheduler()
+    rng = random.Random(1)
+    for _ in range(len(positions)):
+        scheduler.after(rng.uniform(0, 60), int)
+    def step():
+        scheduler.tick(1 / 60)
+    return scheduler, step
+
+
+def bench_coin_sim(positions, scales):
+    sim = CoinSim(capacity=len(positions))
+    now = time.time()
+    for p in positions.tolist():
+        sim.add(p, now)
+    sim.commit()
+    out = TransformBuffer(len(positions)).back
+    def step():
+        sim.step(time.time(), (0, 1, 0), out)
+    return sim, step
+
+
+def bench_meshes(positions, scales):
+    arrays = cake_meshes.scatter(cake_meshes.box(), positions, scales)
+    return arrays, None
+
+
+def bench_engine(positions, scales, kind):
+    # Real ursina entities the way the scripts make them; needs a window
+    style = {
+        'coins': dict(model='sphere', color=color.yellow),
+        'blocks': dict(model='cube', color=color.orange, collider='box'),
+        'trees': dict(model='cube', color=color.brown, collider='box'),
+        'bushes': dict(model='sphere', color=color.green),
+        'platforms': dict(model='cube', color=color.green, collider='box'),
+        'grid': dict(model='cube', color=color.lime, texture='white_cube', collider='box'),
+    }[kind]
+    entities = [Entity(position=p, scale=s, **style) for p, s in zip(positions.tolist(), scales.tolist())]
+    def step():
+        _app.step()
+    def cleanup():
+        for e in entities:
+            destroy(e)
+    return cleanup, step
+
+
+# Coins and question blocks the way sm641-1.py still has them: an update()
+# on every entity, plus the per-frame intersect and hit loops in update().
+# (ursina keeps the frame time on the stdlib time module as time.dt.)
+class ScriptCoin(Entity):
+    def __init__(self, position):
+        super().__init__(model='sphere', color=color.yellow, scale=0.5, position=position, collider='sphere')
+        self.rotation_speed = 100
+
+    def update(self):
+        self.rotation_y += time.dt * self.rotation_speed
+        self.y = self.y + math.sin(time.time() * 5) * 0.01
+
+
+class ScriptBlock(Entity):
+    def __init__(self, position):
+        super().__init__(model='cube', color=color.orange, position=position, collider='box')
+        self.active = True
+        self.bounce_animation = 0
+
+    def update(self):
+        if self.bounce_animation > 0:
+            self.bounce_animation -= time.dt
+
+
+def bench_gameplay(positions, scales, kind):
+    mario = Entity(model='cube', color=color.red, scale=(0.8, 1.6, 0.8), collider='box', position=(0, 1, 0))
+    cls = ScriptCoin if kind == 'coins' else ScriptBlock
+    entities = [cls(position=p) for p in positions.tolist()]
+    def step():
+        for coin in entities if kind == 'coins' else ():
+            coin.intersects(mario)
+        for block in entities if kind == 'blocks' else ():
+            if block.active and mario.y > block.y + 0.5 and abs(mario.x - block.x) < 1 and abs(mario.z - block.z) < 1:
+                block.active = False
+        _app.step()
+    def cleanup():
+        for e in entities + [mario]:
+            destroy(e)
+    return cleanup, step
+
+
+SUBSYSTEMS = {
+    'broadphase': (bench_broadphase, ('blocks', 'trees', 'platforms', 'grid')),
+    'timers': (bench_timers, ('blocks',)),
+    'coin_sim': (bench_coin_sim, ('coins',)),
+    'meshes': (bench_meshes, ('bushes', 'trees', 'platforms')),
+    'engine': (bench_engine, KINDS),
+    'gameplay': (bench_gameplay, ('coins', 'blocks')),
+}
+ENGINE = ('engine', 'gameplay')     # need a window, and get (positions, scales, kind)
+_app = None
+
+
+# --------------------------
+# Harness
+# --------------------------
+def rss():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+def measure(subsystem, kind, count, seed, frames, track_memory):
+    bench = SUBSYSTEMS[subsystem][0]
+    positions, scales = generate_level(count, kind, seed)
+    run = (lambda: bench(positions, scales, kind)) if subsystem in ENGINE else (lambda: bench(positions, scales))
+
+    rss_before = rss()
+    started = time.perf_counter()
+    built, step = run()
+    build_time = time.perf_counter() - started
+    memory = rss() - rss_before
+
+    frame_time = 0.0
+    if step:
+        step()  # warm up
+        started = time.perf_counter()
+        for _ in range(frames):
+            step()
+        frame_time = (time.perf_counter() - started) / frames
+
+    if subsystem in ENGINE:
+        built()
+    elif track_memory:
+        # Second build under tracemalloc: exact Python/NumPy bytes without
+        # tracing skewing the timings above
+        del built, step
+        tracemalloc.start()
+        kept = run()
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del kept
+    return build_time, memory, frame_time
+
+
+def sweep(subsystems, kinds, counts, seed=0, frames=30, limit=30, track_memory=True):
+    results = []
+    for subsystem in subsystems:
+        for kind in SUBSYSTEMS[subsystem][1]:
+            if kinds and kind not in kinds:
+                continue
+            measure(subsystem, kind, 10, seed, 1, False)     # warm-up, not recorded
+            for count in counts:
+                build_time, memory, frame_time = measure(subsystem, kind, count, seed, frames, track_memory)
+                row = (subsystem, kind, count, build_time, memory, frame_time)
+                results.append(row)
+                print(format_row(row), flush=True)
+                if build_time > limit:
+                    print(f'{subsystem}/{kind}: build over {limit}s at {count}, stopping here')
+                    break
+    return results
+
+
+def format_row(row):
+    subsystem, kind, count, build_time, memory, frame_time = row
+    return (f'{subsystem:<11}{kind:<10}{count:>9}{build_time * 1000:>13.1f}'
+            f'{memory / 1024**2:>12.1f}{memory / count:>10.0f}{frame_time * 1000:>12.3f}')
+
+
+HEADER = f'{"subsystem":<11}{"kind":<10}{"count":>9}{"build ms":>13}{"memory MB":>12}{"B/obj":>10}{"frame ms":>12}'
+
+
+def write_results(results, path='bench_output.txt'):
+    with open(path, 'w') as f:
+        f.write(HEADER + '\n')
+        for row in results:
+            f.write(format_row(row) + '\n')
+
+
+def plot(results, path='bench_output.png'):
+    try:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print('matplotlib not installed, skipping plot')
+        return
+
+    fig, axes = plt.subplots(1, 3, figsize=(18, 5))
+    series = {}
+    for subsystem, kind, count, build_time, memory, frame_time in results:
+        series.setdefault(f'{subsystem}/{kind}', []).append((count, build_time, memory, frame_time))
+    for label, rows in series.items():
+        counts = [r[0] for r in rows]
+        for ax, i in zip(axes, (1, 2, 3)):
+            values = [max(r[i], 1e-9) for r in rows]
+            ax.loglog(counts, values, marker='o', label=label)
+    for ax, title in zip(axes, ('build time (s)', 'memory (bytes)', 'frame time (s)')):
+        ax.set_title(title)
+        ax.set_xlabel('objects')
+        ax.grid(True, which='both', alpha=0.3)
+    axes[0].legend(fontsize='small')
+    fig.tight_layout()
+    fig.savefig(path)
+    print(f'plot written to {path}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Stress-level scaling benchmarks')
+    parser.add_argument('--subsystems', default='broadphase,timers,coin_sim,meshes',
+                        help=f'comma-separated, from: {", ".join(SUBSYSTEMS)}')
+    parser.add_argument('--kinds', default='', help=f'comma-separated, from: {", ".join(KINDS)}')
+    parser.add_argument('--min', type=int, default=2, help='smallest size, as a power of ten')
+    parser.add_argument('--max', type=int, default=6, help='largest size, as a power of ten')
+    parser.add_argument('--steps', type=int, default=1, choices=(1, 2), help='sizes per decade (2 adds 3x)')
+    parser.add_argument('--frames', type=int, default=30)
+    parser.add_argument('--limit', type=float, default=30, help='stop growing a series after a build this slow (s)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc pass')
+    args = parser.parse_args()
+
+    subsystems = [s for s in args.subsystems.split(',') if s]
+    kinds = [k for k in args.kinds.split(',') if k]
+    counts = []
+    for e in range(args.min, args.max + 1):
+        counts.append(10**e)
+        if args.steps == 2 and e < args.max:
+            counts.append(3 * 10**e)
+
+    if any(s in ENGINE for s in subsystems):
+        from ursina import Ursina
+        _app = Ursina(development_mode=False)
+
+    print(HEADER)
+    results = sweep(subsystems, kinds, counts, args.seed, args.frames, args.limit, not args.no_memory)
+    write_results(results)
+    plot(results)
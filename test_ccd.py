@@ -0,0 +1,91 @@
+# Headless checks for the player's swept collision (ccd.SweptCapsule over
+# StaticBroadphase.cast), the way 0.py and sm641-1.py use it
+#
+#   python -m pytest test_ccd.py
+import pytest
+from ccd import SweptCapsule
+from chase_camera import StaticBroadphase
+
+# A 0.5-thick platform like create_enhanced_terrain's, top at y = 5.25
+PLATFORM = ((-2.5, 4.75, -1.5), (2.5, 5.25, 1.5))
+TOP = PLATFORM[1][1]
+
+
+def level(*boxes, **kwargs):
+    broadphase = StaticBroadphase(**kwargs)
+    for lo, hi, name in boxes:
+        broadphase.add_box(lo, hi, name)
+    return SweptCapsule(broadphase)
+
+
+def fall(capsule, y, dy, x=0.0, z=0.0):
+    moved, entity = capsule.move_y((x, y, z), dy)
+    return y + moved, entity
+
+
+def test_long_frame_fall_stops_on_a_thin_platform():
+    capsule = level((*PLATFORM, 'platform'), ((-40, 0, -40), (40, 0, 40), 'ground'))
+    y, entity = fall(capsule, 30, -40)      # one 40-unit step straight through it
+    assert entity == 'platform'
+    assert y == pytest.approx(TOP + 0.8 - capsule.skin)
+
+
+def test_landed_body_does_not_tunnel_on_the_next_big_step():
+    capsule = level((*PLATFORM, 'platform'))
+    y = TOP + 0.8                           # where the ground ray settles Mario
+    for _ in range(5):
+        y, entity = fall(capsule, y, -40)
+        assert entity == 'platform'
+        assert y >= TOP + 0.8 - capsule.skin - 1e-9
+        y = TOP + 0.8
+
+
+def test_body_sunk_into_a_box_corner_is_released():
+    capsule = level((*PLATFORM, 'platform'))
+    # Over the corner, outside the real box but inside its rounded-off grown
+    # bounds: the cast stops it, sinking by the skin
+    x, z = 2.5 + 0.35, 1.5 + 0.35
+    y, entity = fall(capsule, 10, -10, x, z)
+    assert entity == 'platform'
+    # Nothing under it settles it, so the next step must let it go
+    y2, entity = fall(capsule, y, -1, x, z)
+    assert entity is None and y2 == pytest.approx(y - 1)
+
+
+def test_touching_is_not_embedded():
+    capsule = level((*PLATFORM, 'platform'))
+    _, entity = fall(capsule, TOP + 0.8, -0.01)
+    assert entity == 'platform'
+
+
+def test_rise_passes_platforms_but_stops_at_an_accepted_block():
+    capsule = level((*PLATFORM, 'platform'), ((9.5, 4.5, -0.5), (10.5, 5.5, 0.5), 'block'))
+    block = lambda entity: entity == 'block'
+
+    moved, entity = capsule.move_y((0, 3, 0), 5, accept=block)
+    assert (moved, entity) == (5, None)
+
+    moved, entity = capsule.move_y((10, 2, 0), 5, accept=block)
+    assert entity == 'block'
+    assert 2 + moved + 0.8 == pytest.approx(4.5)     # head touches the block's underside
+
+
+def test_step_longer_than_the_cell_cap_is_clamped_not_passed_through():
+    # Half-unit cells: a 100-unit fall crosses far more than 64 of them
+    capsule = level((*PLATFORM, 'platform'), cell_size=0.5)
+    y, steps = 110.0, 0
+    while True:
+        y, entity = fall(capsule, y, -100)
+        steps += 1
+        assert y >= TOP + 0.8 - capsule.skin - 1e-9
+        if entity is not None:
+            break
+        assert steps < 10
+    assert entity == 'platform' and steps > 1
+
+
+def test_camera_sweep_still_reports_blockers():
+    broadphase = StaticBroadphase()
+    broadphase.add_box(*PLATFORM, 'platform')
+    hit_t, blocker, _ = broadphase.sweep((0, 1, 0), (0, 9, 0))
+    assert blocker == 'platform' and 0 < hit_t < 1
@@ -0,0 +1,126 @@
+# Headless checks for the netplay snapshot codec and client prediction
+#
+#   python -m pytest test_netplay.py
+import pytest
+import netplay
+from netplay import (NO_BASE, JOIN, WELCOME, W, D, JUMP, RUN, NetClient, PlayerState, Server, World,
+                     decode_snapshot, encode_delta, encode_header, step_player)
+
+
+def pack(base_tick, base, current, coin_bytes=3, block_bytes=2):
+    own = PlayerState()
+    return encode_header(7, base_tick, 42, own) + encode_delta(base, current, coin_bytes, block_bytes)
+
+
+def test_delta_without_baseline_round_trips():
+    current = ({0: (64, 51, -64, 100, 0), 3: (-5, 0, 9, 65535, 12)}, 0b1011, 0b11)
+    decoded = decode_snapshot(pack(NO_BASE, None, current), {}, 3, 2)
+    tick, last_seq, own, snapshot = decoded
+    assert (tick, last_seq) == (7, 42)
+    assert snapshot == current
+
+
+def test_delta_against_baseline_sends_only_changes():
+    base = ({0: (1, 2, 3, 4, 5), 1: (6, 7, 8, 9, 10), 2: (0, 0, 0, 0, 0)}, 0b111, 0b1)
+    unchanged = pack(10, base, base)
+    moved = ({0: (1, 2, 99, 4, 5), 1: (6, 7, 8, 9, 10), 2: (0, 0, 0, 0, 0)}, 0b111, 0b1)
+    assert len(pack(10, base, moved)) == len(unchanged) + 2 + 2     # id/mask + one int16 field
+
+    current = ({0: (1, 2, 99, 4, 5), 1: (6, 7, 8, 9, 11), 4: (3, 3, 3, 3, 3)}, 0b101, 0b0)
+    _, _, _, snapshot = decode_snapshot(pack(10, base, current), {10: base}, 3, 2)
+    assert snapshot == current
+
+
+def test_mask_changes_alone():
+    players = {0: (1, 2, 3, 4, 5)}
+    base = (players, 0b1111, 0b11)
+    for coins, blocks in ((0b0111, 0b11), (0b1111, 0b01), (0, 0)):
+        _, _, _, snapshot = decode_snapshot(pack(5, base, (players, coins, blocks)), {5: base}, 3, 2)
+        assert snapshot == (players, coins, blocks)
+
+
+def test_missing_baseline_is_dropped():
+    base = ({0: (1, 2, 3, 4, 5)}, 1, 1)
+    assert decode_snapshot(pack(5, base, base), {}, 3, 2) is None
+
+
+def test_full_server_fits_counts():
+    players = {pid: (pid, 0, 0, 0, 0) for pid in range(netplay.MAX_PLAYERS)}
+    _, _, _, snapshot = decode_snapshot(pack(NO_BASE, None, (players, 0, 0)), {}, 3, 2)
+    assert snapshot[0] == players
+    _, _, _, snapshot = decode_snapshot(pack(1, (players, 0, 0), ({}, 0, 0)), {1: (players, 0, 0)}, 3, 2)
+    assert snapshot[0] == {}
+
+
+def test_step_player_lands_on_thin_platform_at_low_tick_rate():
+    world = World(1)
+    x, y, z, *_ = world.platforms[0]
+    p = PlayerState()
+    p.x, p.y, p.z = x, y + 2, z
+    p.y_vel = -60
+    step_player(p, 0, 0.1, world, 0)
+    assert p.grounded and p.y == y + 0.25 + 0.8
+
+
+# --------------------------
+# Server and predicting client over in-memory datagrams
+# --------------------------
+class Wire:
+    # Stands in for the server's transport and the client's socket
+    def __init__(self):
+        self.sent = []
+
+    def sendto(self, data, address):
+        self.sent.append((data, address))
+
+
+def connect(server, address):
+    wire = Wire()
+    server.connection_made(wire)
+    client = NetClient()
+    client.sock.close()
+    client.sock = Wire()
+    server.datagram_received(bytes((JOIN,)), address)
+    (welcome, _), = wire.sent
+    assert welcome[0] == WELCOME
+    client.id = welcome[1]
+    client.world = server.world
+    client.coins = server.coins
+    client.blocks = server.blocks
+    wire.sent.clear()
+    return wire, client
+
+
+def run(server, wire, client, address, inputs, drop=()):
+    for tick, buttons in enumerate(inputs):
+        client.send_input(buttons)
+        packet, _ = client.sock.sent.pop()
+        server.datagram_received(packet, address)
+        server.step()
+        snapshot, _ = wire.sent.pop()
+        if tick not in drop:
+            client._receive(snapshot)
+
+
+def test_prediction_matches_server():
+    server, address = Server(seed=3), ('127.0.0.1', 50000)
+    wire, client = connect(server, address)
+    inputs = [W] * 20 + [W | JUMP] * 5 + [W | D | RUN] * 30 + [JUMP] * 10 + [0] * 20
+    run(server, wire, client, address, inputs)
+
+    s, authority = client.state, server.players[address].state
+    assert client.corrections == 0
+    assert not client.pending
+    # The server's state reaches the client as float32
+    assert (s.x, s.y, s.z, s.rotation_y) == pytest.approx((authority.x, authority.y, authority.z, authority.rotation_y), abs=1e-4)
+
+
+def test_reconciliation_survives_lost_snapshots():
+    server, address = Server(seed=3), ('127.0.0.1', 50000)
+    wire, client = connect(server, address)
+    inputs = [W | D] * 40 + [W | JUMP] * 20
+    run(server, wire, client, address, inputs, drop=set(range(5, 30)))
+
+    s, authority = client.state, server.players[address].state
+    assert client.corrections == 0
+    assert (s.x, s.y, s.z) == pytest.approx((authority.x, authority.y, authority.z), abs=1e-4)
@@ -0,0 +1,128 @@
+# Timer wheel + generator coroutines for the playground scripts
+#
+# Entities register one-shot timers (scheduler.after) or start a generator
+# that yields wait(seconds) / a bare yield for "next frame". Only due timers
+# are touched each frame, so idle entities cost nothing. The wheel holds the
+# next revolution; longer timers wait in a heap and are moved onto the wheel
+# once, when their revolution comes round.
+import heapq, itertools, math
+
+# Slack in ticks for float error, so wait(0.5) at 1/60 is 30 ticks, not 31
+EPSILON = 1e-6
+
+
+class wait:
+    __slots__ = ('seconds',)
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+
+
+class Timer:
+    __slots__ = ('tick', 'callback', 'args', 'cancelled')
+
+    def __init__(self, tick, callback, args):
+        self.tick = tick
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class Task:
+    __slots__ = ('coroutine', 'timer', 'cancelled', 'done')
+
+    def __init__(self, coroutine):
+        self.coroutine = coroutine
+        self.timer = None
+        self.cancelled = False
+        self.done = False
+
+    def cancel(self):
+        self.cancelled = True
+        if self.timer:
+            self.timer.cancel()
+        if not self.done:
+            self.done = True
+            self.coroutine.close()
+
+
+class Scheduler:
+    def __init__(self, resolution=1/60, size=512):
+        self.resolution = resolution    # seconds per wheel slot
+        self.size = size                # slots before a timer wraps around
+        self.wheel = [[] for _ in range(size)]
+        self.overflow = []              # (tick, order, timer) beyond one revolution
+        self.order = itertools.count()
+        self.next_frame = []            # tasks that did a bare `yield`
+        self.time = 0.0
+        self.current = 0                # last wheel tick processed
+        self.pending = 0
+
+    # --------------------------
+    # Registration
+    # --------------------------
+    def after(self, delay, callback, *args):
+        ticks = max(1, math.ceil(delay / self.resolution - EPSILON))
+        timer = Timer(self.current + ticks, callback, args)
+        if ticks <= self.size:
+            self.wheel[timer.tick % self.size].append(timer)
+        else:
+            heapq.heappush(self.overflow, (timer.tick, next(self.order), timer))
+        self.pending += 1
+        return timer
+
+    def start(self, coroutine):
+        task = Task(coroutine)
+        self._resume(task)
+        return task
+
+    def _resume(self, task):
+        if task.cancelled:
+            return
+        task.timer = None
+        try:
+            request = next(task.coroutine)
+        except StopIteration:
+            task.done = True
+            return
+
+        if request is None:
+            self.next_frame.append(task)
+        else:
+            seconds = request.seconds if isinstance(request, wait) else request
+            task.timer = self.after(seconds, self._resume, task)
+
+    # --------------------------
+    # Per-frame
+    # --------------------------
+    def tick(self, dt):
+        self.time += dt
+
+        # Coroutines animating every frame
+        if self.next_frame:
+            tasks, self.next_frame = self.next_frame, []
+            for task in tasks:
+                self._resume(task)
+
+        # Advance the wheel; only buckets we pass over are visited, and every
+        # timer in one is due, since the wheel never holds more than a revolution
+        target = int(self.time / self.resolution + EPSILON)
+        while self.current < target:
+            self.current += 1
+            horizon = self.current + self.size - 1
+            while self.overflow and self.overflow[0][0] <= horizon:
+                timer = heapq.heappop(self.overflow)[2]
+                self.wheel[timer.tick % self.size].append(timer)
+
+            slot = self.current % self.size
+            due = self.wheel[slot]
+            if not due:
+                continue
+            self.wheel[slot] = []
+            self.pending -= len(due)
+            for timer in due:
+                if not timer.cancelled:
+                    timer.callback(*timer.args)